@@ -0,0 +1,28 @@
+"""Process-wide cache of support-chat answers.
+
+Most chat traffic is the same few questions ("track my order", "price
+list", the quick-action buttons). An answer depends only on the intent,
+the resolved entities and the data behind it. It is therefore cached under
+those plus the inventory and order-store versions (and, for messages
+answered from the FAQ corpus, the data/faq.json version). Any stock, order
+or FAQ change produces new keys. Old keys then age out of the LRU.
+"""
+import streamlit as st
+
+from lru import LRUCache
+
+MAX_ANSWERS = 1024
+
+
+class AnswerCache(LRUCache):
+    def __init__(self, max_entries=MAX_ANSWERS):
+        super().__init__(max_entries)
+
+    def get(self, key, version, build):
+        # key: (intent, entities...); version: data versions the answer was built from
+        return self.get_or_build((key, version), build)
+
+
+@st.cache_resource(show_spinner=False)
+def get_answer_cache():
+    return AnswerCache()
@@ -7,8 +7,31 @@ from datetime import datetime, timedelta
 import random
 from PIL import Image
 import io
+import os
 import base64
 
+from answer_cache import get_answer_cache
+from chat_store import get_chat_store
+from chat_transcript import PAGE_SIZE, ChatTranscript
+from classify import loyalty_level, stock_status, supplier_performance
+from data_loader import load_cities, load_settings, load_supplier_view, load_suppliers
+from entities import EntityResolver
+from faq_retrieval import get_faq_retriever
+from figure_cache import frame_token, get_figure_cache
+from forecast import get_forecast_service
+from intents import get_intent_matcher
+from inventory_service import InsufficientStock, current_shipments, get_inventory_service
+from labels import LABELS_DIR, READY_STATUSES, TRACKING_PREFIXES, iter_labels, write_csv, write_zip
+from notify import get_notifier, is_phone, owner_contacts
+from order_ids import get_order_id_allocator
+from order_store import get_order_store
+from reorder import plan_reorders, purchase_orders
+from routing import get_router
+from search_filters import RESULT_LIMIT, get_search_filters
+from search_index import get_search_index
+from shipment_risk import get_risk_engine
+from simulator import get_simulation
+
 # Page Configuration
 st.set_page_config(
     page_title="Luxemart Supply Chain AI Agent",
@@ -367,16 +390,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'inventory' not in st.session_state:
-    st.session_state.inventory = pd.DataFrame({
-        'Product': ['iPhone 15 Cover', 'Samsung Charger', 'Infinix Cable', 'Realme C51', 'iPhone Charger', 'Samsung Cover'],
-        'Stock': [4, 8, 15, 22, 12, 6],
-        'Min_Stock': [10, 15, 20, 30, 20, 10],
-        'Daily_Sales': [7, 5, 8, 12, 6, 3],
-        'Price': [1500, 800, 500, 35000, 2000, 1200],
-        'Supplier': ['Supplier A', 'Supplier B', 'Supplier C', 'Supplier C', 'Supplier A', 'Supplier B'],
-        'Category': ['Accessories', 'Accessories', 'Accessories', 'Mobile', 'Accessories', 'Accessories']
-    })
+# Inventory and suppliers come from data/*.csv through the shared, mtime-keyed
+# loader, so every session points at the same frame instead of its own copy
+inventory_service = get_inventory_service()
+st.session_state.inventory = inventory_service.frame
+search_index = get_search_index(inventory_service)
+search_filters = get_search_filters(inventory_service, search_index)
+# Orders are persisted in data/luxemart.db and shared by all sessions
+order_store = get_order_store()
+order_ids = get_order_id_allocator()
+# Email/SMS/WhatsApp go through a background queue (local outbox in data/outbox/)
+notifier = get_notifier()
+business_name = load_settings().get('business_name', 'Luxemart')
+# Support chat transcripts and their running totals, also in data/luxemart.db
+chat_store = get_chat_store()
+# Demand forecasts fold in each completed day once and keep Daily_Sales derived from orders
+forecasts = get_forecast_service(inventory_service, order_store)
+forecasts.refresh()
+# Inbound shipments scored for delay risk; refreshes rescore only changed rows
+risk_engine = get_risk_engine(inventory_service, load_settings())
+# Built figures are reused until the data behind them changes
+figure_cache = get_figure_cache()
+
+
+# Helper: reorder lines for the current low-stock rows (lead times, MOQs, inbound stock)
+def current_reorder_plan():
+    return plan_reorders(
+        st.session_state.inventory,
+        load_suppliers(),
+        current_shipments(inventory_service),
+        labels=inventory_service.low_stock.labels()
+    )
 
 # --- FIXED: Initialize search_results, show_search_analytics, search_history, chat_messages, and last_input ---
 if 'search_results' not in st.session_state:
@@ -386,34 +430,19 @@ if 'show_search_analytics' not in st.session_state:
 if 'search_history' not in st.session_state: 
     st.session_state.search_history = []
 if 'chat_messages' not in st.session_state:
-    st.session_state.chat_messages = [
+    # Ring buffer of recent messages backed by the shared chat store; the
+    # conversation ID is kept in the URL so a refresh reopens the same chat
+    st.session_state.chat_messages = ChatTranscript(chat_store, st.query_params.get("chat"))
+    st.query_params["chat"] = st.session_state.chat_messages.conversation_id
+    # Opening message: shown above the transcript, not stored as part of it
+    st.session_state.chat_greeting = (
         {"role": "assistant", "content": "🙋‍♂️ Assalam-o-Alaikum! Main **Luxemart** ka AI Support Agent hun. \n\n📱 Main aap ki madad kar sakta hun:\n• Order tracking\n• Product information  \n• Delivery status\n• Returns & complaints\n• Price inquiries\n\nAap kya janna chahte hain?", "timestamp": datetime.now().strftime('%H:%M')}
-    ]
+    )
+    st.session_state.chat_window = PAGE_SIZE
 if 'last_input' not in st.session_state: 
     st.session_state.last_input = None
 # --- END FIX ---
 
-if 'orders' not in st.session_state:
-    st.session_state.orders = []
-
-if 'suppliers' not in st.session_state:
-    st.session_state.suppliers = pd.DataFrame({
-        'Supplier': ['Supplier A', 'Supplier B', 'Supplier C'],
-        'Location': ['China', 'Dubai', 'Turkey'],
-        'Rating': [4.5, 4.2, 4.8],
-        'Lead_Time': [7, 10, 5],
-        'Contact': ['+86-123-456789', '+971-987-654321', '+90-555-123456']
-    })
-
-if 'deliveries' not in st.session_state:
-    st.session_state.deliveries = pd.DataFrame({
-        'Delivery_ID': [f'DEL{i+1000}' for i in range(5)],
-        'City': ['Karachi', 'Lahore', 'Islamabad', 'Faisalabad', 'Multan'],
-        'Status': ['In Transit', 'Delivered', 'Processing', 'Delayed', 'Delivered'],
-        'Courier': ['TCS', 'Leopards', 'TCS', 'Blue Ex', 'TCS'],
-        'Expected': [(datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, 6)]
-    })
-
 if 'notifications' not in st.session_state:
     st.session_state.notifications = []
 
@@ -426,6 +455,7 @@ if 'customers' not in st.session_state:
         'Name': ['Ahmed Ali', 'Fatima Khan', 'Hassan Sheikh', 'Ayesha Malik', 'Usman Tariq'],
         'City': ['Karachi', 'Lahore', 'Islamabad', 'Karachi', 'Faisalabad'],
         'Phone': ['0300-1234567', '0321-9876543', '0333-1122334', '0345-5566778', '0301-9988776'],
+        'Email': ['ahmed.ali@example.pk', 'fatima.khan@example.pk', 'hassan.sheikh@example.pk', 'ayesha.malik@example.pk', 'usman.tariq@example.pk'],
         'Total_Orders': [12, 8, 15, 6, 10],
         'Status': ['VIP', 'Regular', 'VIP', 'New', 'Regular']
     })
@@ -433,6 +463,38 @@ if 'customers' not in st.session_state:
 if 'alerts' not in st.session_state:
     st.session_state.alerts = []
 
+# Sidebar quick actions: a click reruns only this fragment, not the whole app
+@st.fragment
+def render_quick_actions():
+    st.markdown("### Quick Actions")
+    action_col1, action_col2 = st.columns(2)
+
+    with action_col1:
+        if st.button("🚨 Alert", use_container_width=True):
+            alert = random.choice([
+                "⚠️ iPhone Cover stock critically low!",
+                "📦 New shipment arriving tomorrow",
+                "🚚 Delivery delay in Karachi route",
+                "💰 Price drop alert for Samsung products"
+            ])
+            st.session_state.alerts.append({
+                'time': datetime.now().strftime('%H:%M'),
+                'message': alert,
+                'type': 'warning'
+            })
+            st.toast(alert)
+
+    with action_col2:
+        if st.button("📦 Reorder", use_container_width=True):
+            reorder_lines = current_reorder_plan()
+            if not reorder_lines.empty:
+                st.success(f"✅ Auto-ordered {len(reorder_lines)} items on {len(purchase_orders(reorder_lines))} purchase orders")
+            elif len(inventory_service.low_stock):
+                st.info("ℹ️ Low stock items are covered by inbound shipments")
+            else:
+                st.info("ℹ️ All items in stock")
+
+
 # Enhanced Responsive Sidebar
 with st.sidebar:
     st.markdown("## 🤖 AI Agent Controls")
@@ -455,32 +517,7 @@ with st.sidebar:
     st.success("✅ AI Agent Active")
     st.info(f"📅 Last Update: {datetime.now().strftime('%H:%M:%S')}")
     
-    # Quick Actions with better layout
-    st.markdown("### Quick Actions")
-    action_col1, action_col2 = st.columns(2)
-    
-    with action_col1:
-        if st.button("🚨 Alert", use_container_width=True):
-            alert = random.choice([
-                "⚠️ iPhone Cover stock critically low!",
-                "📦 New shipment arriving tomorrow",
-                "🚚 Delivery delay in Karachi route",
-                "💰 Price drop alert for Samsung products"
-            ])
-            st.session_state.alerts.append({
-                'time': datetime.now().strftime('%H:%M'),
-                'message': alert,
-                'type': 'warning'
-            })
-            st.rerun()
-    
-    with action_col2:
-        if st.button("📦 Reorder", use_container_width=True):
-            low_stock_items = st.session_state.inventory[st.session_state.inventory['Stock'] < st.session_state.inventory['Min_Stock']]
-            if not low_stock_items.empty:
-                st.success(f"✅ Auto-ordered {len(low_stock_items)} items")
-            else:
-                st.info("ℹ️ All items in stock")
+    render_quick_actions()
 
 # Main Header with enhanced design
 st.markdown("""
@@ -490,19 +527,8 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Enhanced Main Tabs
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-    "📊 Dashboard", 
-    "📦 Inventory", 
-    "🚚 Orders & Logistics", 
-    "📈 Analytics", 
-    "🗣️ Customer Support",
-    "📸 Product Images",
-    "🏢 Suppliers",
-    "👥 Customer Management"
-])
-
-with tab1:
+# Main sections: each page is a function and only the selected one runs (see PAGES)
+def render_dashboard():
     st.markdown("## 📊 Real-time Dashboard")
     
     # Enhanced Key Metrics with responsive grid
@@ -518,7 +544,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col2:
-        low_stock_count = len(st.session_state.inventory[st.session_state.inventory['Stock'] < st.session_state.inventory['Min_Stock']])
+        low_stock_count = len(inventory_service.low_stock)
         st.markdown(f"""
         <div class="metric-card">
             <h3>{low_stock_count}</h3>
@@ -549,32 +575,58 @@ with tab1:
     # Enhanced Alerts Section
     st.markdown("## 🚨 Live Alerts & Notifications")
     
-    # Check for low stock automatically
-    low_stock_items = st.session_state.inventory[st.session_state.inventory['Stock'] < st.session_state.inventory['Min_Stock']]
+    # Low stock rows are tracked incrementally by the inventory service
+    low_stock_items = inventory_service.low_stock.frame()
     
     if not low_stock_items.empty:
+        reorder_lines = current_reorder_plan()
         alert_col1, alert_col2 = st.columns([2, 1])
         
         with alert_col1:
-            for _, item in low_stock_items.iterrows():
+            for label, item in low_stock_items.iterrows():
                 days_left = item['Stock'] / item['Daily_Sales'] if item['Daily_Sales'] > 0 else 0
+                if label in reorder_lines.index:
+                    recommendation = f"Recommended: Order {reorder_lines.at[label, 'Order_Qty']} units from {item['Supplier']}"
+                else:
+                    recommendation = "Inbound shipments already cover this item"
                 st.markdown(f"""
                 <div class="alert-card">
                     <h4>⚠️ Critical Stock Alert</h4>
                     <p><strong>{item['Product']}</strong> - Only {item['Stock']} units remaining</p>
                     <p>📅 Days remaining: {days_left:.1f} days</p>
-                    <p>💡 Recommended: Order {item['Min_Stock'] * 2} units from {item['Supplier']}</p>
+                    <p>💡 {recommendation}</p>
                 </div>
                 """, unsafe_allow_html=True)
         
         with alert_col2:
             st.markdown("### ⚡ Quick Actions")
             if st.button("🔄 Auto-Reorder All", use_container_width=True):
-                st.success("✅ Auto-reorder initiated for all low stock items!")
-                st.balloons()
+                if reorder_lines.empty:
+                    st.info("ℹ️ Inbound shipments already cover all low stock items")
+                else:
+                    st.success("✅ Auto-reorder initiated for all low stock items!")
+                    st.dataframe(purchase_orders(reorder_lines), use_container_width=True, hide_index=True)
+                    st.balloons()
             
             if st.button("📧 Notify Suppliers", use_container_width=True):
-                st.success("📧 Suppliers notified successfully!")
+                if reorder_lines.empty:
+                    # Nothing to order, so neither suppliers nor the owner are messaged
+                    st.info("ℹ️ Inbound shipments already cover all low stock items; no suppliers to notify")
+                else:
+                    # Queued for the background notifier; one email per supplier with its reorder lines
+                    contacts = load_suppliers().set_index('supplier_id')['contact']
+                    queued = 0
+                    for supplier_id, lines in reorder_lines.groupby('Supplier_ID'):
+                        body = "\n".join(f"{sku} {product}: {qty} units" for sku, product, qty in zip(lines['SKU'], lines['Product'], lines['Order_Qty']))
+                        queued += notifier.notify('email', [contacts.get(supplier_id)], "Luxemart purchase request", body)
+                    owner_email, owner_phone = owner_contacts()
+                    summary = f"{len(reorder_lines)} low stock items sent to {queued} suppliers"
+                    notifier.notify('email', [owner_email], "Suppliers notified", summary)
+                    st.success(f"📧 {queued} supplier emails queued!")
+                    if is_phone(owner_phone):
+                        notifier.notify('sms', [owner_phone], "Suppliers notified", summary)
+                    else:
+                        st.warning(f"⚠️ No SMS sent: notify_phone in data/settings.json is not a phone number ({owner_phone})")
     else:
         st.markdown("""
         <div class="success-card">
@@ -583,6 +635,56 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
     
+    # Booking a receipt puts the units on the shelf once, for every session
+    shipments = current_shipments(inventory_service)
+    open_shipments = shipments[~shipments['received']]
+    if not open_shipments.empty:
+        st.markdown("### 📥 Inbound Shipments")
+        inbound = {
+            shipment_id: (str(sku), int(qty))
+            for shipment_id, sku, qty in zip(open_shipments['shipment_id'], open_shipments['sku'], open_shipments['qty'])
+        }
+        receive_col1, receive_col2 = st.columns([3, 1])
+        with receive_col1:
+            shipment_id = st.selectbox(
+                "Inbound shipment",
+                list(inbound),
+                format_func=lambda sid: f"{sid} · {inbound[sid][0]} × {inbound[sid][1]}",
+                key="receive_shipment_id"
+            )
+        with receive_col2:
+            if st.button("📥 Mark Received", key="receive_shipment", use_container_width=True):
+                sku, qty = inbound[shipment_id]
+                if inventory_service.receive(shipment_id, sku, qty) is None:
+                    st.info(f"ℹ️ {shipment_id} was already received")
+                else:
+                    # Rerun so the stock cards and alerts above pick up the new units
+                    st.session_state.alerts.append({
+                        'time': datetime.now().strftime('%H:%M'),
+                        'message': f"📥 {shipment_id}: {qty} units of {sku} added to stock",
+                        'type': 'success'
+                    })
+                    st.rerun()
+    
+    # Inbound shipments that are late or may arrive after stock runs out
+    risk_engine.refresh(shipments)
+    delayed = risk_engine.at_risk()
+    if not delayed.empty:
+        st.markdown("### ⏱️ Inbound Delay Risk")
+        for _, shipment in delayed.head(5).iterrows():
+            icon = "🔴" if shipment['Risk_Level'] == 'High' else "🟠"
+            eta = pd.Timestamp(shipment['ETA']).strftime('%Y-%m-%d')
+            st.markdown(f"""
+            <div class="alert-card">
+                <h4>{icon} Delay risk: {shipment['Shipment_ID']} ({shipment['Risk_Level']})</h4>
+                <p><strong>{shipment['Product']}</strong> - {shipment['Qty']} units from {shipment['Supplier_ID']} to {shipment['Warehouse']}, ETA {eta}</p>
+                <p>📦 Stock cover: {shipment['Cover_Days']} days</p>
+                <p>💡 {shipment['Reason']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        if len(delayed) > 5:
+            st.caption(f"{len(delayed) - 5} more inbound shipments at risk")
+    
     # Display other alerts
     if st.session_state.alerts:
         st.markdown("### 📢 Recent Notifications")
@@ -602,45 +704,52 @@ with tab1:
     
     with chart_col1:
         st.markdown("### 📦 Current Stock Levels")
-        inventory_fig = px.bar(
-            st.session_state.inventory, 
-            x='Product', 
-            y='Stock',
-            title='Real-time Inventory Status',
-            color='Stock',
-            color_continuous_scale='Viridis',
-            text='Stock'
-        )
-        inventory_fig.update_traces(texttemplate='%{text}', textposition='outside')
-        inventory_fig.update_layout(
-            height=400,
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Inter, sans-serif"),
-            title_font_size=16
-        )
+        inventory_token = (inventory_service.key, inventory_service.version)
+        def build_inventory_fig():
+            inventory_fig = px.bar(
+                st.session_state.inventory, 
+                x='Product', 
+                y='Stock',
+                title='Real-time Inventory Status',
+                color='Stock',
+                color_continuous_scale='Viridis',
+                text='Stock'
+            )
+            inventory_fig.update_traces(texttemplate='%{text}', textposition='outside')
+            inventory_fig.update_layout(
+                height=400,
+                showlegend=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(family="Inter, sans-serif"),
+                title_font_size=16
+            )
+            return inventory_fig
+        inventory_fig = figure_cache.get('inventory_stock', inventory_token, build_inventory_fig)
         st.plotly_chart(inventory_fig, use_container_width=True)
     
     with chart_col2:
         st.markdown("### 💰 Revenue Distribution")
-        category_revenue = st.session_state.inventory.groupby('Category').apply(
-            lambda x: (x['Stock'] * x['Price']).sum()
-        ).reset_index()
-        category_revenue.columns = ['Category', 'Revenue']
-        
-        pie_fig = px.pie(
-            category_revenue,
-            values='Revenue',
-            names='Category',
-            title='Revenue by Category',
-            hole=0.4
-        )
-        pie_fig.update_layout(
-            height=400,
-            font=dict(family="Inter, sans-serif"),
-            title_font_size=16
-        )
+        def build_pie_fig():
+            category_revenue = (st.session_state.inventory['Stock'] * st.session_state.inventory['Price']).groupby(
+                st.session_state.inventory['Category'], observed=True
+            ).sum().reset_index()
+            category_revenue.columns = ['Category', 'Revenue']
+        
+            pie_fig = px.pie(
+                category_revenue,
+                values='Revenue',
+                names='Category',
+                title='Revenue by Category',
+                hole=0.4
+            )
+            pie_fig.update_layout(
+                height=400,
+                font=dict(family="Inter, sans-serif"),
+                title_font_size=16
+            )
+            return pie_fig
+        pie_fig = figure_cache.get('category_revenue', inventory_token, build_pie_fig)
         st.plotly_chart(pie_fig, use_container_width=True)
         
         # Additional metrics in this column
@@ -648,8 +757,52 @@ with tab1:
         st.metric("Order Fulfillment", "94%", "2%")
         st.metric("Customer Satisfaction", "4.8/5", "0.1")
         st.metric("Delivery Time", "3.2 days", "-0.3")
+    
+    # Day-in-the-life simulation from today's stock, reorder rules and open shipments
+    st.markdown("## 🧪 Day-in-the-Life Simulator")
+    sim_col1, sim_col2 = st.columns([3, 1])
+    with sim_col1:
+        sim_days = st.slider("Days to simulate", 30, 365, 90, step=30, key="sim_days")
+    with sim_col2:
+        sim_seed = st.number_input("Seed", min_value=0, value=0, step=1, key="sim_seed")
+    if st.button("▶️ Run Simulation", key="run_simulation"):
+        st.session_state.simulation = (sim_days, int(sim_seed))
+    
+    if st.session_state.get('simulation'):
+        sim_days, sim_seed = st.session_state.simulation
+        simulation = get_simulation(inventory_service, sim_days, sim_seed)
+        sim_summary = simulation.summary()
+        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+        kpi1.metric("Fill Rate", f"{sim_summary['fill_rate']:.1%}")
+        kpi2.metric("Lost Sales", f"{sim_summary['lost_sales']:,} units")
+        kpi3.metric("Purchase Orders", sim_summary['purchase_orders'], f"{sim_summary['late_arrivals']} late", delta_color="inverse")
+        kpi4.metric("Revenue", f"Rs {sim_summary['revenue']:,}")
+        
+        def build_simulation_fig():
+            simulation_fig = px.line(
+                simulation.daily,
+                x='Date',
+                y=['Stock_Units', 'Units_Sold', 'Lost_Sales'],
+                title=f'Simulated {sim_days} Days'
+            )
+            simulation_fig.update_layout(
+                height=400,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(family="Inter, sans-serif"),
+                title_font_size=16
+            )
+            return simulation_fig
+        simulation_fig = figure_cache.get('simulation', frame_token(simulation.daily), build_simulation_fig)
+        st.plotly_chart(simulation_fig, use_container_width=True)
+        st.dataframe(
+            simulation.skus.sort_values('Lost_Sales', ascending=False).head(10),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(f"{sim_summary['events']} events in {sim_summary['seconds']}s · `python simulator.py --days 365` runs it headless")
 
-with tab2:
+def render_inventory():
     st.markdown("## 🔍 Smart Search & Advanced Filters")
     
     # Advanced Search Interface
@@ -658,16 +811,9 @@ with tab2:
     search_main_col1, search_main_col2 = st.columns([2, 1])
     
     with search_main_col1:
-        # Helper function for product search
-        def search_products(query):
-            df = st.session_state.inventory
-            query = query.lower()
-            mask = (
-                df['Product'].str.lower().str.contains(query)
-                | df['Category'].str.lower().str.contains(query)
-                | df['Supplier'].str.lower().str.contains(query)
-            )
-            return df[mask]
+        # Helper function for product search (ranked, served from the prebuilt index)
+        def search_products(query, fuzzy=False):
+            return st.session_state.inventory.loc[search_index.search(query, limit=RESULT_LIMIT, fuzzy=fuzzy)]
 
         # Main search bar
         advanced_search = st.text_input(
@@ -676,6 +822,12 @@ with tab2:
             placeholder="Search by product name, category, supplier, or any keyword...",
             key="advanced_search_main"
         )
+        fuzzy_search = st.checkbox(
+            "🔤 Typo-tolerant search",
+            value=False,
+            help="Matches misspelled words too, e.g. 'chargr' or 'iphon cvr'",
+            key="adv_fuzzy"
+        )
         
         # Search options
         search_opt_col1, search_opt_col2, search_opt_col3 = st.columns(3)
@@ -706,39 +858,23 @@ with tab2:
         st.markdown("#### 🎛️ Search Controls")
         
         if st.button("🔍 Advanced Search", use_container_width=True, key="do_advanced_search"):
-            # Perform advanced search
-            search_results = st.session_state.inventory.copy()
-            
-            # Apply text search
-            if advanced_search:
-                search_results = search_products(advanced_search)
-                # Add to history only if a search query was actually entered
-                if advanced_search not in st.session_state.search_history:
-                    st.session_state.search_history.insert(0, advanced_search) # Add to front
-                    st.session_state.search_history = st.session_state.search_history[:5] # Keep last 5
-            
-            # Apply category filter
-            if search_category != "All Categories":
-                search_results = search_results[search_results['Category'] == search_category]
-            
-            # Apply supplier filter
-            if search_supplier != "All Suppliers":
-                search_results = search_results[search_results['Supplier'] == search_supplier]
+            # Perform advanced search: text, category, supplier and price are
+            # evaluated as one combined mask (memoized per filter combination)
+            result_labels = search_filters.run(
+                advanced_search,
+                fuzzy=fuzzy_search,
+                category=None if search_category == "All Categories" else search_category,
+                supplier=None if search_supplier == "All Suppliers" else search_supplier,
+                price_range=None if price_range == "All" else price_range,
+                limit=RESULT_LIMIT
+            )
             
-            # Apply price filter
-            if price_range != "All":
-                if price_range == "0-1K":
-                    search_results = search_results[search_results['Price'] <= 1000]
-                elif price_range == "1K-5K":
-                    search_results = search_results[(search_results['Price'] > 1000) & (search_results['Price'] <= 5000)]
-                elif price_range == "5K-20K":
-                    search_results = search_results[(search_results['Price'] > 5000) & (search_results['Price'] <= 20000)]
-                elif price_range == "20K-50K":
-                    search_results = search_results[(search_results['Price'] > 20000) & (search_results['Price'] <= 50000)]
-                elif price_range == "50K+":
-                    search_results = search_results[search_results['Price'] > 50000]
+            # Add to history only if a search query was actually entered
+            if advanced_search and advanced_search not in st.session_state.search_history:
+                st.session_state.search_history.insert(0, advanced_search) # Add to front
+                st.session_state.search_history = st.session_state.search_history[:5] # Keep last 5
             
-            st.session_state.search_results = search_results
+            st.session_state.search_results = st.session_state.inventory.loc[result_labels]
         
         if st.button("🔄 Reset Filters", use_container_width=True):
             st.session_state.search_results = pd.DataFrame()
@@ -748,150 +884,156 @@ with tab2:
         if st.button("📊 Search Analytics", use_container_width=True):
             st.session_state.show_search_analytics = True
     
-    # Quick Search Buttons
-    st.markdown("### ⚡ Quick Searches")
-    quick_search_cols = st.columns(6)
-    
-    quick_searches = [
-        ("📱 iPhones", "iPhone"),
-        ("🔌 Chargers", "charger"),
-        ("📶 Samsung", "Samsung"),
-        ("🔴 Low Stock", "low_stock"),
-        ("💰 Under 5K", "under_5k"),
-        ("🎯 Best Sellers", "best_sellers")
-    ]
-    
-    for i, (label, search_term) in enumerate(quick_searches):
-        with quick_search_cols[i]:
-            if st.button(label, key=f"quick_{search_term}", use_container_width=True):
-                if search_term == "low_stock":
-                    search_results = st.session_state.inventory[
-                        st.session_state.inventory['Stock'] < st.session_state.inventory['Min_Stock']
-                    ]
-                    st.session_state.search_history.insert(0, "Low Stock Items")
-                elif search_term == "under_5k":
-                    search_results = st.session_state.inventory[st.session_state.inventory['Price'] < 5000]
-                    st.session_state.search_history.insert(0, "Products Under 5K")
-                elif search_term == "best_sellers":
-                    search_results = st.session_state.inventory.nlargest(5, 'Daily_Sales')
-                    st.session_state.search_history.insert(0, "Best Sellers")
-                else:
-                    search_results = search_products(search_term)
-                    st.session_state.search_history.insert(0, f"'{search_term}'")
-                
-                st.session_state.search_history = st.session_state.search_history[:5] # Keep last 5
-                st.session_state.search_results = search_results
-                st.rerun()
+    # Quick searches, results and history rerun on their own when used
+    @st.fragment
+    def render_search_results():
+        # Quick Search Buttons
+        st.markdown("### ⚡ Quick Searches")
+        quick_search_cols = st.columns(6)
+    
+        quick_searches = [
+            ("📱 iPhones", "iPhone"),
+            ("🔌 Chargers", "charger"),
+            ("📶 Samsung", "Samsung"),
+            ("🔴 Low Stock", "low_stock"),
+            ("💰 Under 5K", "under_5k"),
+            ("🎯 Best Sellers", "best_sellers")
+        ]
     
-    # Display Search Results
-    if not st.session_state.search_results.empty:
-        st.markdown("---")
-        st.markdown(f"### 📋 Search Results ({len(st.session_state.search_results)} items found)")
-        
-        # Search results with enhanced display
-        results_display = st.session_state.search_results.copy()
-        results_display['Stock_Status'] = results_display.apply(
-            lambda x: '🔴 Critical' if x['Stock'] < x['Min_Stock'] 
-            else '🟡 Low' if x['Stock'] < x['Min_Stock'] * 1.5 
-            else '🟢 Good', axis=1
-        )
-        results_display['Days_Left'] = results_display['Stock'] / results_display['Daily_Sales']
-        results_display['Total_Value'] = results_display['Stock'] * results_display['Price']
-        
-        # Interactive table
-        st.dataframe(
-            results_display[['Product', 'Category', 'Stock', 'Stock_Status', 'Price', 'Total_Value', 'Supplier', 'Days_Left']],
-            use_container_width=True
-        )
-        
-        # Results summary
-        col_summary1, col_summary2, col_summary3, col_summary4 = st.columns(4)
-        
-        with col_summary1:
-            st.metric("Products Found", len(results_display))
-        with col_summary2:
-            st.metric("Total Stock Value", f"Rs {results_display['Total_Value'].sum():,}")
-        with col_summary3:
-            st.metric("Avg Price", f"Rs {results_display['Price'].mean():,.0f}")
-        with col_summary4:
-            critical_count = len(results_display[results_display['Stock_Status'] == '🔴 Critical'])
-            st.metric("Critical Stock Items", critical_count)
-        
-        # Action buttons for search results
-        st.markdown("#### 🎯 Actions on Search Results")
-        action_cols = st.columns(5)
-        
-        with action_cols[0]:
-            if st.button("📦 Bulk Reorder Selected", key="bulk_reorder_results"):
-                reorder_items = results_display[results_display['Stock_Status'] == '🔴 Critical']
-                if not reorder_items.empty:
-                    st.success(f"✅ Bulk reorder initiated for {len(reorder_items)} critical items")
-                else:
-                    st.info("No critical stock items to reorder")
-        
-        with action_cols[1]:
-            if st.button("📊 Detailed Report", key="detailed_report"):
-                st.info("📋 Generating detailed analysis report...")
-                # You could expand this to show more detailed analytics
-        
-        with action_cols[2]:
-            if st.button("📤 Export Results", key="export_results"):
-                csv = results_display.to_csv(index=False)
-                st.download_button(
-                    "💾 Download CSV",
-                    csv,
-                    f"search_results_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    "text/csv",
-                    key="download_search_csv"
-                )
-        
-        with action_cols[3]:
-            if st.button("📱 Share Results", key="share_results"):
-                st.success("🔗 Shareable link generated for search results")
-        
-        with action_cols[4]:
-            if st.button("📈 Visual Analysis", key="visual_analysis"):
-                st.session_state.show_search_analytics = True # Set flag to show analytics
-    
-    # Show Search Analytics if flag is true
-    if st.session_state.show_search_analytics:
-        st.markdown("#### 📊 Search Results Visualization")
-        
-        viz_col1, viz_col2 = st.columns(2)
-        
-        with viz_col1:
-            # Stock status pie chart
-            status_counts = results_display['Stock_Status'].value_counts() # type: ignore
-            fig_status = px.pie(
-                values=status_counts.values,
-                names=status_counts.index,
-                title="Stock Status Distribution"
-            )
-            st.plotly_chart(fig_status, use_container_width=True)
-        
-        with viz_col2:
-            # Price distribution bar chart
-            fig_price = px.bar(
-                results_display.head(10), # type: ignore
-                x='Product',
-                y='Price',
-                title="Price Comparison (Top 10)",
-                color='Price'
+        for i, (label, search_term) in enumerate(quick_searches):
+            with quick_search_cols[i]:
+                if st.button(label, key=f"quick_{search_term}", use_container_width=True):
+                    if search_term == "low_stock":
+                        search_results = inventory_service.low_stock.frame()
+                        st.session_state.search_history.insert(0, "Low Stock Items")
+                    elif search_term == "under_5k":
+                        search_results = st.session_state.inventory[st.session_state.inventory['Price'] < 5000]
+                        st.session_state.search_history.insert(0, "Products Under 5K")
+                    elif search_term == "best_sellers":
+                        search_results = st.session_state.inventory.nlargest(5, 'Daily_Sales')
+                        st.session_state.search_history.insert(0, "Best Sellers")
+                    else:
+                        search_results = search_products(search_term)
+                        st.session_state.search_history.insert(0, f"'{search_term}'")
+                
+                    st.session_state.search_history = st.session_state.search_history[:5] # Keep last 5
+                    st.session_state.search_results = search_results
+    
+        # Display Search Results
+        if not st.session_state.search_results.empty:
+            st.markdown("---")
+            found = len(st.session_state.search_results)
+            shown = f"top {found} shown" if found == RESULT_LIMIT else f"{found} items found"
+            st.markdown(f"### 📋 Search Results ({shown})")
+        
+            # Search results with enhanced display
+            results_display = st.session_state.search_results.copy()
+            results_display['Stock_Status'] = stock_status(results_display['Stock'], results_display['Min_Stock'])
+            results_display['Days_Left'] = results_display['Stock'] / results_display['Daily_Sales']
+            results_display['Total_Value'] = results_display['Stock'] * results_display['Price']
+        
+            # Interactive table
+            st.dataframe(
+                results_display[['Product', 'Category', 'Stock', 'Stock_Status', 'Price', 'Total_Value', 'Supplier', 'Days_Left']],
+                use_container_width=True
             )
-            fig_price.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_price, use_container_width=True)
-    
-    # Search History
-    st.markdown("---")
-    st.markdown("### 🕘 Search History")
-    if st.session_state.search_history:
-        for i, query in enumerate(st.session_state.search_history):
-            st.markdown(f"🔍 {i+1}. {query}")
-    else:
-        st.info("No search history yet.")
+        
+            # Results summary
+            col_summary1, col_summary2, col_summary3, col_summary4 = st.columns(4)
+        
+            with col_summary1:
+                st.metric("Products Found", len(results_display))
+            with col_summary2:
+                st.metric("Total Stock Value", f"Rs {results_display['Total_Value'].sum():,}")
+            with col_summary3:
+                st.metric("Avg Price", f"Rs {results_display['Price'].mean():,.0f}")
+            with col_summary4:
+                critical_count = len(results_display[results_display['Stock_Status'] == '🔴 Critical'])
+                st.metric("Critical Stock Items", critical_count)
+        
+            # Action buttons for search results
+            st.markdown("#### 🎯 Actions on Search Results")
+            action_cols = st.columns(5)
+        
+            with action_cols[0]:
+                if st.button("📦 Bulk Reorder Selected", key="bulk_reorder_results"):
+                    reorder_items = results_display[results_display['Stock_Status'] == '🔴 Critical']
+                    if not reorder_items.empty:
+                        st.success(f"✅ Bulk reorder initiated for {len(reorder_items)} critical items")
+                    else:
+                        st.info("No critical stock items to reorder")
+        
+            with action_cols[1]:
+                if st.button("📊 Detailed Report", key="detailed_report"):
+                    st.info("📋 Generating detailed analysis report...")
+                    # You could expand this to show more detailed analytics
+        
+            with action_cols[2]:
+                if st.button("📤 Export Results", key="export_results"):
+                    csv = results_display.to_csv(index=False)
+                    st.download_button(
+                        "💾 Download CSV",
+                        csv,
+                        f"search_results_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                        "text/csv",
+                        key="download_search_csv"
+                    )
+        
+            with action_cols[3]:
+                if st.button("📱 Share Results", key="share_results"):
+                    st.success("🔗 Shareable link generated for search results")
+        
+            with action_cols[4]:
+                if st.button("📈 Visual Analysis", key="visual_analysis"):
+                    st.session_state.show_search_analytics = True # Set flag to show analytics
+    
+        # Show Search Analytics if flag is true
+        if st.session_state.show_search_analytics:
+            st.markdown("#### 📊 Search Results Visualization")
+        
+            viz_col1, viz_col2 = st.columns(2)
+        
+            with viz_col1:
+                # Stock status pie chart
+                def build_fig_status():
+                    status_counts = results_display['Stock_Status'].value_counts() # type: ignore
+                    fig_status = px.pie(
+                        values=status_counts.values,
+                        names=status_counts.index,
+                        title="Stock Status Distribution"
+                    )
+                    return fig_status
+                fig_status = figure_cache.get('search_status', frame_token(results_display), build_fig_status)
+                st.plotly_chart(fig_status, use_container_width=True)
+        
+            with viz_col2:
+                # Price distribution bar chart
+                def build_fig_price():
+                    fig_price = px.bar(
+                        results_display.head(10), # type: ignore
+                        x='Product',
+                        y='Price',
+                        title="Price Comparison (Top 10)",
+                        color='Price'
+                    )
+                    fig_price.update_layout(xaxis_tickangle=-45)
+                    return fig_price
+                fig_price = figure_cache.get('search_prices', frame_token(results_display), build_fig_price)
+                st.plotly_chart(fig_price, use_container_width=True)
+    
+        # Search History
+        st.markdown("---")
+        st.markdown("### 🕘 Search History")
+        if st.session_state.search_history:
+            for i, query in enumerate(st.session_state.search_history):
+                st.markdown(f"🔍 {i+1}. {query}")
+        else:
+            st.info("No search history yet.")
+
+    render_search_results()
 
 
-with tab3:
+def render_orders():
     st.markdown("## 🚚 Orders & Logistics Management")
     
     col1, col2 = st.columns(2)
@@ -900,38 +1042,51 @@ with tab3:
         st.markdown("### 📋 Create New Order")
         with st.form("new_order"):
             customer_name = st.text_input("Customer Name")
-            customer_city = st.selectbox("City", ["Karachi", "Lahore", "Islamabad", "Faisalabad", "Multan"])
+            customer_city = st.selectbox("City", load_cities()['name'].tolist())
             selected_product = st.selectbox("Product", st.session_state.inventory['Product'].tolist())
             quantity = st.number_input("Quantity", min_value=1, value=1)
             
             if st.form_submit_button("Create Order"):
-                # Check if stock is available
-                product_stock = st.session_state.inventory[st.session_state.inventory['Product'] == selected_product]['Stock'].iloc[0]
-                
-                if quantity <= product_stock:
-                    # Create order
-                    order_id = f"LUX{random.randint(1000, 9999)}"
-                    new_order = {
-                        'Order_ID': order_id,
-                        'Customer': customer_name,
-                        'City': customer_city,
-                        'Product': selected_product,
-                        'Quantity': quantity,
-                        'Status': 'Processing',
-                        'Created': datetime.now().strftime('%Y-%m-%d %H:%M'),
-                        'Delivery_Date': (datetime.now() + timedelta(days=random.randint(2, 5))).strftime('%Y-%m-%d')
-                    }
-                    
-                    st.session_state.orders.append(new_order)
-                    
-                    # Update inventory
-                    idx = st.session_state.inventory[st.session_state.inventory['Product'] == selected_product].index[0]
-                    st.session_state.inventory.loc[idx, 'Stock'] -= quantity # type: ignore
-                    
-                    st.success(f"✅ Order {order_id} created successfully!")
-                    st.rerun()
+                # Reserve stock atomically; fails if another session took the units first
+                idx = inventory_service.lookup(product=selected_product)
+                # Nearest warehouse holding the stock decides the delivery estimate
+                route = get_router().route(
+                    pd.DataFrame({'City': [customer_city], 'SKU': [st.session_state.inventory.at[idx, 'SKU']], 'Quantity': [quantity]}),
+                    st.session_state.inventory
+                ).iloc[0]
+                try:
+                    inventory_service.reserve(idx, quantity)
+                except InsufficientStock as shortage:
+                    st.error(f"❌ Insufficient stock! Only {shortage.available} units available.")
                 else:
-                    st.error(f"❌ Insufficient stock! Only {product_stock} units available.")
+                    # Create order, written before success is shown; the reservation is
+                    # given back if the order cannot be stored
+                    try:
+                        order_id = order_ids.allocate()
+                        new_order = {
+                            'Order_ID': order_id,
+                            'Customer': customer_name,
+                            'City': customer_city,
+                            'SKU': st.session_state.inventory.at[idx, 'SKU'],
+                            'Product': selected_product,
+                            'Quantity': quantity,
+                            'Status': 'Processing',
+                            'Created': datetime.now().strftime('%Y-%m-%d %H:%M'),
+                            'Delivery_Date': (datetime.now() + timedelta(days=int(route['Est_Days']))).strftime('%Y-%m-%d'),
+                            'Warehouse': route['Warehouse']
+                        }
+                        stored = order_store.insert(new_order)
+                    except Exception:
+                        inventory_service.release(idx, quantity)
+                        raise
+                    if not stored:
+                        inventory_service.release(idx, quantity)
+                        st.error(f"❌ Order {order_id} already exists; the stock was not taken. Please try again.")
+                    else:
+                        if route['Warehouse'] is not None:
+                            st.toast(f"🧭 {order_id} ships from {route['Warehouse']} ({route['Distance_km']:.0f} km)")
+                        st.success(f"✅ Order {order_id} created successfully!")
+                        st.rerun()
     
     with col2:
         st.markdown("### 📊 Delivery Analytics")
@@ -947,17 +1102,20 @@ with tab3:
         fig = px.bar(delivery_data, x='City', y='Orders', title='Orders by City')
         st.plotly_chart(fig, use_container_width=True)
     
-    # Recent Orders
+    # Recent Orders (only the tail is read from the order store)
     st.markdown("### 📦 Recent Orders")
-    if st.session_state.orders:
-        orders_df = pd.DataFrame(st.session_state.orders)
-        st.dataframe(orders_df, use_container_width=True)
+    orders_df = order_store.recent(50)
+    if not orders_df.empty:
+        st.dataframe(
+            orders_df[['Order_ID', 'Customer', 'City', 'Product', 'Quantity', 'Status', 'Created', 'Delivery_Date']],
+            use_container_width=True
+        )
         
         # Order tracking
         st.markdown("### 🔍 Order Tracking")
         if orders_df.shape[0] > 0:
             selected_order = st.selectbox("Select Order to Track", orders_df['Order_ID'].tolist())
-            order_details = orders_df[orders_df['Order_ID'] == selected_order].iloc[0]
+            order_details = order_store.get(selected_order)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -971,8 +1129,61 @@ with tab3:
                 st.info(f"**Delivery Date:** {order_details['Delivery_Date']}")
     else:
         st.info("📋 No orders yet. Create your first order above!")
+    
+    # Fulfillment routing for every order ready to ship, in one batch; orders keep
+    # the warehouse chosen (and reserved at) when they were created
+    st.markdown("### 🧭 Fulfillment Routing")
+    if st.button("🧭 Route Ready Orders", key="route_orders"):
+        ready = list(order_store.iter_frames(READY_STATUSES))
+        ready = pd.concat(ready, ignore_index=True) if ready else pd.DataFrame()
+        if ready.empty:
+            st.info("📋 No orders waiting to ship")
+        else:
+            routes = ready[['Order_ID', 'City', 'Product', 'Quantity']].join(
+                get_router().route(ready, st.session_state.inventory)
+            )
+            unrouted = routes['Warehouse'].isna()
+            summary = routes[~unrouted].groupby('Warehouse').agg(
+                Orders=('Order_ID', 'size'), Units=('Quantity', 'sum'), Avg_km=('Distance_km', 'mean')
+            ).round(1)
+            st.dataframe(summary, use_container_width=True)
+            st.dataframe(routes, use_container_width=True, hide_index=True)
+            if unrouted.any():
+                st.warning(f"⚠️ {int(unrouted.sum())} orders have no warehouse with enough stock or capacity")
+    
+    # Courier labels for every order ready to ship, streamed to data/labels/ in chunks
+    st.markdown("### 🏷️ Courier Labels")
+    couriers = load_settings().get('couriers') or list(TRACKING_PREFIXES)
+    label_col1, label_col2 = st.columns(2)
+    with label_col1:
+        label_couriers = st.multiselect("Couriers", couriers, default=couriers, key="label_couriers")
+    with label_col2:
+        label_format = st.radio("Format", ["CSV", "ZIP (one CSV per courier)"], horizontal=True, key="label_format")
+    
+    if st.button("🏷️ Generate Labels", key="generate_labels"):
+        LABELS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        label_chunks = iter_labels(order_store, st.session_state.inventory, couriers, only=label_couriers)
+        if label_format == "CSV":
+            label_path = LABELS_DIR / f"labels_{stamp}.csv"
+            label_count = write_csv(label_chunks, label_path)
+        else:
+            label_path = LABELS_DIR / f"labels_{stamp}.zip"
+            label_count = sum(write_zip(label_chunks, label_path).values())
+        st.session_state.label_file = str(label_path)
+        st.success(f"✅ {label_count} labels written to {label_path.name}")
+    
+    if st.session_state.get('label_file') and os.path.exists(st.session_state.label_file):
+        with open(st.session_state.label_file, 'rb') as label_fh:
+            st.download_button(
+                "💾 Download Labels",
+                label_fh,
+                os.path.basename(st.session_state.label_file),
+                "application/zip" if st.session_state.label_file.endswith('.zip') else "text/csv",
+                key="download_labels"
+            )
 
-with tab4:
+def render_analytics():
     st.markdown("## 📈 Supply Chain Analytics")
     
     # Sales Forecast
@@ -981,43 +1192,41 @@ with tab4:
     with col1:
         st.markdown("### 📊 Sales Forecast")
         
-        # Generate forecast data
-        dates = pd.date_range(start=datetime.now(), periods=30, freq='D')
-        forecast_data = pd.DataFrame({
-            'Date': dates,
-            'Predicted_Sales': [random.randint(15, 45) for _ in range(30)],
-            'Confidence_Lower': [random.randint(10, 25) for _ in range(30)],
-            'Confidence_Upper': [random.randint(35, 55) for _ in range(30)]
-        })
-        
-        forecast_fig = go.Figure()
-        forecast_fig.add_trace(go.Scatter(
-            x=forecast_data['Date'],
-            y=forecast_data['Predicted_Sales'],
-            mode='lines',
-            name='Predicted Sales',
-            line=dict(color='blue')
-        ))
-        
-        forecast_fig.add_trace(go.Scatter(
-            x=forecast_data['Date'],
-            y=forecast_data['Confidence_Upper'],
-            mode='lines',
-            line=dict(width=0),
-            showlegend=False
-        ))
-        
-        forecast_fig.add_trace(go.Scatter(
-            x=forecast_data['Date'],
-            y=forecast_data['Confidence_Lower'],
-            mode='lines',
-            fill='tonexty',
-            fillcolor='rgba(0,100,80,0.2)',
-            line=dict(width=0),
-            name='Confidence Interval'
-        ))
-        
-        forecast_fig.update_layout(title='30-Day Sales Forecast', height=400)
+        forecast_token = (inventory_service.key, forecasts.forecaster.through, datetime.now().date())
+        # Per-SKU SES/TSB forecasts summed over the catalog, with a 95% band
+        def build_forecast_fig():
+            forecast_data = forecasts.forecast(30)
+        
+            forecast_fig = go.Figure()
+            forecast_fig.add_trace(go.Scatter(
+                x=forecast_data['Date'],
+                y=forecast_data['Predicted_Sales'],
+                mode='lines',
+                name='Predicted Sales',
+                line=dict(color='blue')
+            ))
+        
+            forecast_fig.add_trace(go.Scatter(
+                x=forecast_data['Date'],
+                y=forecast_data['Confidence_Upper'],
+                mode='lines',
+                line=dict(width=0),
+                showlegend=False
+            ))
+        
+            forecast_fig.add_trace(go.Scatter(
+                x=forecast_data['Date'],
+                y=forecast_data['Confidence_Lower'],
+                mode='lines',
+                fill='tonexty',
+                fillcolor='rgba(0,100,80,0.2)',
+                line=dict(width=0),
+                name='Confidence Interval'
+            ))
+        
+            forecast_fig.update_layout(title='30-Day Sales Forecast', height=400)
+            return forecast_fig
+        forecast_fig = figure_cache.get('sales_forecast', forecast_token, build_forecast_fig)
         st.plotly_chart(forecast_fig, use_container_width=True)
     
     with col2:
@@ -1050,109 +1259,151 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        revenue_fig = px.line(trend_data, x='Month', y='Revenue', title='Monthly Revenue Trend')
+        def build_revenue_fig():
+            revenue_fig = px.line(trend_data, x='Month', y='Revenue', title='Monthly Revenue Trend')
+            return revenue_fig
+        revenue_fig = figure_cache.get('revenue_trend', frame_token(trend_data), build_revenue_fig)
         st.plotly_chart(revenue_fig, use_container_width=True)
     
     with col2:
-        orders_fig = px.line(trend_data, x='Month', y='Orders', title='Monthly Orders Trend', color_discrete_sequence=['orange'])
+        def build_orders_fig():
+            orders_fig = px.line(trend_data, x='Month', y='Orders', title='Monthly Orders Trend', color_discrete_sequence=['orange'])
+            return orders_fig
+        orders_fig = figure_cache.get('orders_trend', frame_token(trend_data), build_orders_fig)
         st.plotly_chart(orders_fig, use_container_width=True)
 
-with tab5:
+def render_support():
     st.markdown("## 🗣️ Customer Support AI Assistant")
     
     # chat_messages initialized at the top now
     
+    # Keyword intents from data/intents.json, compiled once into a single regex
+    intent_matcher = get_intent_matcher()
+    # Order IDs, SKUs and product names in a message, resolved through the store/inventory indexes
+    entity_resolver = EntityResolver(inventory_service, search_index, order_store)
+    # TF-IDF retrieval over data/faq.json and the catalog, built once per file version
+    faq_retriever = get_faq_retriever()
+    answer_cache = get_answer_cache()
+    
     # Helper function for intelligent responses
     def get_ai_response(user_message):
-        message_lower = user_message.lower()
+        intent = intent_matcher.best(user_message)
+        entities = entity_resolver.resolve(user_message)
+        if intent is None and (entities['orders'] or entities['missing_orders']):
+            intent = 'order'
+        elif intent is None and entities['products']:
+            intent = 'product'
+        # Same intent + entities + data versions -> same answer; unmatched messages are keyed on their text
+        answer_key = (
+            intent,
+            tuple(entities['orders']),
+            tuple(entities['missing_orders']),
+            tuple(entities['products']),
+            ' '.join(user_message.lower().split()) if intent is None else None
+        )
+        # Unmatched messages are answered from data/faq.json, so they also follow its version
+        answer_version = (
+            inventory_service.key,
+            inventory_service.version,
+            order_store.current_version(),
+            faq_retriever.version if intent is None else None
+        )
+        return answer_cache.get(answer_key, answer_version, lambda: build_ai_response(user_message, intent, entities))
+    
+    def build_ai_response(user_message, intent, entities):
+        mentioned_products = st.session_state.inventory.loc[entities['products'][:5], ['Product', 'SKU', 'Stock', 'Price']]
         
         # Order tracking
-        if any(word in message_lower for word in ['order', 'track', 'tracking', 'lux', 'status']):
-            if st.session_state.orders:
-                order_list = "\n".join([f"• {order['Order_ID']} - {order['Status']}" for order in st.session_state.orders[-3:]])
+        if intent == 'order':
+            if entities['orders'] or entities['missing_orders']:
+                order_info = ""
+                for order_id, order in entities['orders'].items():
+                    order_info += f"📦 **{order_id}** - {order['Status']}\n"
+                    order_info += f"• Product: {order['Product'] or order['SKU']} × {order['Quantity']}\n"
+                    if order['Courier']:
+                        order_info += f"• Courier: {order['Courier']} (Tracking: {order['Tracking'] or 'N/A'})\n"
+                    if order['Delivered_Date']:
+                        order_info += f"• Delivered: {order['Delivered_Date']}\n"
+                    elif order['Delivery_Date']:
+                        order_info += f"• Expected Delivery: {order['Delivery_Date']}\n"
+                for order_id in entities['missing_orders']:
+                    order_info += f"❌ **{order_id}** nahi mila. Order ID dobara check kar lein.\n"
+                return order_info
+            recent_orders = order_store.recent(3)
+            if not recent_orders.empty:
+                order_list = "\n".join([f"• {order_id} - {status}" for order_id, status in zip(recent_orders['Order_ID'], recent_orders['Status'])])
                 return f"📦 **Recent Orders:**\n{order_list}\n\nKya aap koi specific Order ID track karna chahte hain?"
             else:
                 return "📋 Abhi tak koi order nahi hai. Kya aap naya order place karna chahte hain?"
         
         # Product inquiries
-        elif any(word in message_lower for word in ['product', 'mobile', 'phone', 'cover', 'charger', 'cable']):
-            available_products = st.session_state.inventory[['Product', 'Stock', 'Price']].head(3)
+        elif intent == 'product':
+            available_products = mentioned_products if not mentioned_products.empty else st.session_state.inventory[['Product', 'Stock', 'Price']].head(3)
             product_info = ""
             for _, product in available_products.iterrows():
-                stock_status = "✅ Available" if product['Stock'] > 0 else "❌ Out of Stock"
+                stock_status = f"✅ {product['Stock']} in stock" if product['Stock'] > 0 else "❌ Out of Stock"
                 product_info += f"• **{product['Product']}** - Rs {product['Price']:,} ({stock_status})\n"
             return f"📱 **Available Products:**\n{product_info}\nKya aap koi specific product ke bare mein janna chahte hain?"
         
         # Price inquiries
-        elif any(word in message_lower for word in ['price', 'cost', 'rate', 'kitna', 'paisa']):
-            return "💰 **Price List:**\n• iPhone Accessories: Rs 1,500 - 2,000\n• Samsung Products: Rs 800 - 1,500\n• Cables & Chargers: Rs 500 - 800\n• Mobile Phones: Rs 35,000+\n\nKis product ka exact price chahiye?"
+        elif intent == 'price':
+            if not mentioned_products.empty:
+                price_list = "\n".join([f"• **{name}** ({sku}): Rs {price:,}" for name, sku, price in zip(mentioned_products['Product'], mentioned_products['SKU'], mentioned_products['Price'])])
+                return f"💰 **Price:**\n{price_list}\n\nKya aap order place karna chahte hain?"
+            price_ranges = st.session_state.inventory.groupby('Category', observed=True)['Price'].agg(['min', 'max'])
+            price_list = "\n".join([f"• {category}: Rs {low:,}" + (f" - {high:,}" if high != low else "") for category, low, high in zip(price_ranges.index, price_ranges['min'], price_ranges['max'])])
+            return f"💰 **Price List:**\n{price_list}\n\nKis product ka exact price chahiye?"
         
         # Delivery inquiries
-        elif any(word in message_lower for word in ['delivery', 'deliver', 'shipping', 'transport', 'pohanchana']):
+        elif intent == 'delivery':
             return "🚚 **Delivery Information:**\n• Karachi: 1-2 days\n• Lahore: 2-3 days\n• Islamabad: 2-3 days\n• Other cities: 3-5 days\n\n📦 Free delivery on orders above Rs 5,000!\nKya aap apna city bata sakte hain?"
         
         # Return/complaint
-        elif any(word in message_lower for word in ['return', 'complaint', 'problem', 'issue', 'defect', 'kharab']):
+        elif intent == 'return':
             return "🔄 **Return Policy:**\n• 7 days return guarantee\n• Product original condition mein hona chahiye\n• Bill/receipt zaroori hai\n\n📞 Complaint ke liye:\n• Call: 0300-LUXEMART\n• WhatsApp: Same number\n\nMain aap ki complaint forward kar deta hun manager ko."
         
         # Greetings
-        elif any(word in message_lower for word in ['salam', 'hello', 'hi', 'hey', 'assalam']):
+        elif intent == 'greeting':
             return "🙋‍♂️ Wa alaikum assalam! Luxemart mein aap ka swagat hai. Main aap ki kya madad kar sakta hun?"
         
         # Thanks
-        elif any(word in message_lower for word in ['thanks', 'thank you', 'shukriya', 'dhanyawad']):
+        elif intent == 'thanks':
             return "😊 Aap ka bahut shukriya! Kya aur koi madad chahiye? Main hamesha yahan hun!"
         
-        # Default response with suggestions
+        # Anything else: best match from the FAQ/policy/product corpus, then suggestions
         else:
+            matches = faq_retriever.search(user_message, k=1)
+            if matches and matches[0][0]['kind'] == 'faq':
+                faq = matches[0][0]
+                return f"📋 **{faq['question']}**\n\n✅ {faq['answer']}"
+            if matches:
+                product = st.session_state.inventory.loc[inventory_service.lookup(sku=matches[0][0]['sku'])]
+                stock_status = f"✅ {product['Stock']} in stock" if product['Stock'] > 0 else "❌ Out of Stock"
+                return f"📱 **{product['Product']}** - Rs {product['Price']:,} ({stock_status})\n\nKya aap order place karna chahte hain?"
             return f"🤔 Main samajh gaya ke aap **'{user_message}'** ke bare mein pooch rahe hain.\n\n💡 **Main yeh madad kar sakta hun:**\n• Order status check karna\n• Product information dena\n• Delivery time batana\n• Return process explain karna\n\nKya aap koi specific cheez poochna chahte hain?"
     
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
+    # Live chat: sending a message reruns only this fragment
+    @st.fragment
+    def render_chat():
         st.markdown("### 💬 Live Chat Support")
-        
+    
         # Chat container with custom styling
         chat_container = st.container()
-        
-        with chat_container:
-            # Display chat messages with enhanced styling
-            st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-            
-            for i, message in enumerate(st.session_state.chat_messages):
-                timestamp = message.get('timestamp', datetime.now().strftime('%H:%M'))
-                
-                if message["role"] == "user":
-                    st.markdown(f"""
-                    <div class="user-message">
-                        <strong>👤 You ({timestamp}):</strong><br>
-                        <span style="color: white; font-size: 14px;">{message['content']}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="ai-message">
-                        <strong>🤖 Luxemart AI ({timestamp}):</strong><br>
-                        <span style="color: white; font-size: 14px;">{message['content']}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-        
+    
         # Chat input with better UX
         st.markdown("---")
         col_input, col_send = st.columns([4, 1])
-        
+    
         with col_input:
             user_input = st.text_input(
                 "Type your message...", 
                 key="chat_input",
                 placeholder="Jaise: 'Order track karna hai' ya 'iPhone cover ka price?'"
             )
-        
+    
         with col_send:
             send_clicked = st.button("📤 Send", use_container_width=True)
-        
+    
         # Process user input
         if (send_clicked and user_input) or (user_input and st.session_state.get('last_input') != user_input and user_input.strip() != ''): # Added check for empty string
             if user_input.strip():
@@ -1163,7 +1414,7 @@ with tab5:
                     "content": user_input,
                     "timestamp": timestamp
                 })
-                
+            
                 # Generate AI response
                 ai_response = get_ai_response(user_input)
                 st.session_state.chat_messages.append({
@@ -1171,14 +1422,13 @@ with tab5:
                     "content": ai_response,
                     "timestamp": timestamp
                 })
-                
+            
                 st.session_state.last_input = user_input
-                st.rerun()
-        
+    
         # Quick action buttons
         st.markdown("### ⚡ Quick Actions")
         quick_col1, quick_col2, quick_col3 = st.columns(3)
-        
+    
         with quick_col1:
             if st.button("📦 Track My Order"):
                 timestamp = datetime.now().strftime('%H:%M')
@@ -1193,8 +1443,7 @@ with tab5:
                     "content": response,
                     "timestamp": timestamp
                 })
-                st.rerun()
-        
+    
         with quick_col2:
             if st.button("💰 Check Prices"):
                 timestamp = datetime.now().strftime('%H:%M')
@@ -1209,8 +1458,7 @@ with tab5:
                     "content": response,
                     "timestamp": timestamp
                 })
-                st.rerun()
-        
+    
         with quick_col3:
             if st.button("🚚 Delivery Info"):
                 timestamp = datetime.now().strftime('%H:%M')
@@ -1225,24 +1473,62 @@ with tab5:
                     "content": response,
                     "timestamp": timestamp
                 })
-                st.rerun()
-        
+    
         # Clear chat option
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.chat_messages = [
+            st.session_state.chat_messages.clear()
+            st.query_params["chat"] = st.session_state.chat_messages.conversation_id
+            st.session_state.chat_greeting = (
                 {"role": "assistant", "content": "🙋‍♂️ Chat history clear ho gaya! Main dobara aap ki madad ke liye hazir hun.", "timestamp": datetime.now().strftime('%H:%M')}
-            ]
-            st.rerun()
-    
+            )
+            st.session_state.chat_window = PAGE_SIZE
+        
+        with chat_container:
+            # Display chat messages; drawn last so this run already includes any reply
+            st.markdown('<div class="chat-container">', unsafe_allow_html=True)
+        
+            # Only the newest chat_window messages are drawn; older pages come from the archive
+            hidden = len(st.session_state.chat_messages) - st.session_state.chat_window
+            if hidden > 0 and st.button(f"⬆️ Load older messages ({hidden} more)", key="chat_load_older"):
+                st.session_state.chat_window += PAGE_SIZE
+            
+            visible = st.session_state.chat_messages.last(st.session_state.chat_window)
+            if hidden <= 0:
+                visible.insert(0, st.session_state.chat_greeting)
+            
+            for i, message in enumerate(visible):
+                timestamp = message.get('timestamp', datetime.now().strftime('%H:%M'))
+            
+                if message["role"] == "user":
+                    st.markdown(f"""
+                    <div class="user-message">
+                        <strong>👤 You ({timestamp}):</strong><br>
+                        <span style="color: white; font-size: 14px;">{message['content']}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                else:
+                    st.markdown(f"""
+                    <div class="ai-message">
+                        <strong>🤖 Luxemart AI ({timestamp}):</strong><br>
+                        <span style="color: white; font-size: 14px;">{message['content']}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+        
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        render_chat()
+
     with col2:
         st.markdown("### 🎯 Support Dashboard")
         
-        # Real-time support stats
-        total_messages = len(st.session_state.chat_messages)
-        user_messages = len([msg for msg in st.session_state.chat_messages if msg['role'] == 'user'])
+        # Real-time support stats across all conversations (kept as running totals by the chat store)
+        chat_stats = chat_store.stats()
         
-        st.metric("Chat Messages", total_messages)
-        st.metric("User Queries", user_messages)
+        st.metric("Chat Messages", chat_stats['messages'])
+        st.metric("User Queries", chat_stats['user_messages'])
         st.metric("Response Rate", "100%")
         
         st.markdown("---")
@@ -1314,11 +1600,11 @@ with tab5:
         
         st.markdown("### 📊 Live Support Stats")
         
-        # Dynamic stats based on actual chat
+        # Dynamic stats based on actual chat: active in the last 15 minutes, average wait for a reply
         current_hour = datetime.now().hour
         support_stats = {
-            "Active Chats": random.randint(15, 45),
-            "Queue Wait": f"{random.randint(0, 3)} min",
+            "Active Chats": chat_stats['active_conversations'],
+            "Queue Wait": f"{chat_stats['avg_wait_seconds']:.1f} s",
             "Satisfaction": "4.9/5 ⭐",
             "Online Agents": random.randint(8, 12)
         }
@@ -1329,12 +1615,7 @@ with tab5:
         # FAQ Section
         st.markdown("### ❓ Common Questions")
         
-        faqs = [
-            ("Order tracking kaise kare?", "Order ID aur mobile number chahiye"),
-            ("Return policy kya hai?", "7 days return guarantee"),
-            ("Delivery charges kitne?", "Rs 150, free above Rs 5000"),
-            ("Payment methods?", "Cash, Card, JazzCash, EasyPaisa")
-        ]
+        faqs = [(faq['question'], faq['answer']) for faq in faq_retriever.common_questions()]
         
         for question, answer in faqs:
             if st.button(f"❓ {question}", key=f"faq_{question}"):
@@ -1351,7 +1632,7 @@ with tab5:
                 })
                 st.rerun()
 
-with tab6:
+def render_product_images():
     st.markdown("## 📸 Product Image Management")
     
     col1, col2 = st.columns([1, 1])
@@ -1393,12 +1674,7 @@ with tab6:
         st.markdown("### 🖼️ Product Gallery")
         
         # Sample product images (placeholder)
-        sample_products = [
-            "iPhone 15 Cover",
-            "Samsung Charger", 
-            "Infinix Cable",
-            "Realme C51"
-        ]
+        sample_products = st.session_state.inventory['Product'].head(4).tolist()
         
         for product in sample_products:
             with st.expander(f"📱 {product}"):
@@ -1427,7 +1703,8 @@ with tab6:
         for stat, value in img_stats.items():
             st.metric(stat, value)
 
-with tab7:
+def render_suppliers():
+    st.session_state.suppliers = load_supplier_view()
     st.markdown("## 🏢 Supplier Management")
     
     col1, col2 = st.columns([2, 1])
@@ -1437,9 +1714,7 @@ with tab7:
         
         # Display suppliers with enhanced info
         supplier_display = st.session_state.suppliers.copy()
-        supplier_display['Performance'] = supplier_display['Rating'].apply(
-            lambda x: '🟢 Excellent' if x >= 4.5 else '🟡 Good' if x >= 4.0 else '🔴 Needs Improvement'
-        )
+        supplier_display['Performance'] = supplier_performance(supplier_display['Rating'])
         
         st.dataframe(
             supplier_display[['Supplier', 'Location', 'Rating', 'Lead_Time', 'Performance', 'Contact']],
@@ -1452,11 +1727,19 @@ with tab7:
         col_a, col_b, col_c = st.columns(3)
         with col_a:
             if st.button("📧 Send Email"):
-                st.success(f"✅ Email sent to {selected_supplier}")
+                supplier_contact = st.session_state.suppliers[st.session_state.suppliers['Supplier'] == selected_supplier]['Contact'].iloc[0]
+                notifier.notify('email', [supplier_contact], f"Message from {business_name}", f"Dear {selected_supplier}, please get in touch with {business_name}.")
+                st.success(f"✅ Email queued for {selected_supplier}")
         with col_b:
             if st.button("📱 WhatsApp"):
-                supplier_contact = st.session_state.suppliers[st.session_state.suppliers['Supplier'] == selected_supplier]['Contact'].iloc[0]
-                st.success(f"✅ WhatsApp opened: {supplier_contact}")
+                # WhatsApp needs a phone number: the phone column, or a contact that is one
+                supplier_row = st.session_state.suppliers[st.session_state.suppliers['Supplier'] == selected_supplier].iloc[0]
+                supplier_phone = next((value for value in (supplier_row['Phone'], supplier_row['Contact']) if is_phone(value)), None)
+                if supplier_phone is None:
+                    st.warning(f"⚠️ No phone number on file for {selected_supplier}; add one in the phone column of data/suppliers.csv")
+                else:
+                    notifier.notify('whatsapp', [supplier_phone], f"Message from {business_name}", f"Dear {selected_supplier}, please get in touch with {business_name}.")
+                    st.success(f"✅ WhatsApp queued: {supplier_phone}")
         with col_c:
             if st.button("📋 New Order"):
                 st.info(f"📦 Opening order form for {selected_supplier}")
@@ -1465,25 +1748,32 @@ with tab7:
         st.markdown("### 📊 Supplier Analytics")
         
         # Supplier performance chart
-        perf_fig = px.bar(
-            st.session_state.suppliers,
-            x='Supplier',
-            y='Rating',
-            title='Supplier Performance Ratings',
-            color='Rating',
-            color_continuous_scale='Viridis'
-        )
-        perf_fig.update_layout(height=300)
+        suppliers_token = frame_token(st.session_state.suppliers)
+        def build_perf_fig():
+            perf_fig = px.bar(
+                st.session_state.suppliers,
+                x='Supplier',
+                y='Rating',
+                title='Supplier Performance Ratings',
+                color='Rating',
+                color_continuous_scale='Viridis'
+            )
+            perf_fig.update_layout(height=300)
+            return perf_fig
+        perf_fig = figure_cache.get('supplier_ratings', suppliers_token, build_perf_fig)
         st.plotly_chart(perf_fig, use_container_width=True)
         
         st.markdown("### ⏱️ Lead Times")
-        lead_fig = px.pie(
-            st.session_state.suppliers,
-            values='Lead_Time',
-            names='Supplier',
-            title='Lead Time Distribution'
-        )
-        lead_fig.update_layout(height=300)
+        def build_lead_fig():
+            lead_fig = px.pie(
+                st.session_state.suppliers,
+                values='Lead_Time',
+                names='Supplier',
+                title='Lead Time Distribution'
+            )
+            lead_fig.update_layout(height=300)
+            return lead_fig
+        lead_fig = figure_cache.get('supplier_lead_times', suppliers_token, build_lead_fig)
         st.plotly_chart(lead_fig, use_container_width=True)
         
         st.markdown("### 📈 Quick Stats")
@@ -1494,7 +1784,7 @@ with tab7:
         st.metric("Average Lead Time", f"{avg_lead_time:.0f} days")
         st.metric("Total Suppliers", len(st.session_state.suppliers))
 
-with tab8:
+def render_customers():
     st.markdown("## 👥 Customer Management & CRM")
     
     col1, col2 = st.columns([2, 1])
@@ -1504,9 +1794,7 @@ with tab8:
         
         # Enhanced customer display
         customer_display = st.session_state.customers.copy()
-        customer_display['Loyalty_Level'] = customer_display['Total_Orders'].apply(
-            lambda x: '🌟 VIP' if x >= 15 else '💎 Premium' if x >= 10 else '🥉 Regular' if x >= 5 else '🆕 New'
-        )
+        customer_display['Loyalty_Level'] = loyalty_level(customer_display['Total_Orders'])
         
         st.dataframe(
             customer_display[['Customer_ID', 'Name', 'City', 'Phone', 'Total_Orders', 'Loyalty_Level', 'Status']],
@@ -1533,40 +1821,56 @@ with tab8:
                 st.success(f"📞 Calling {customer_info['Phone']}")
         with comm_col2:
             if st.button("💬 Send SMS"):
-                st.success(f"📱 SMS sent to {selected_customer}")
+                notifier.notify('sms', [customer_info['Phone']], business_name, f"Dear {selected_customer}, thank you for shopping with {business_name}!")
+                st.success(f"📱 SMS queued for {selected_customer}")
         with comm_col3:
             if st.button("✉️ Email"):
-                st.success(f"📧 Email sent to {selected_customer}")
+                notifier.notify('email', [customer_info.get('Email')], f"Thank you from {business_name}", f"Dear {selected_customer}, thank you for shopping with {business_name}!")
+                st.success(f"📧 Email queued for {selected_customer}")
+        
+        # Bulk messages are queued in one call and delivered in batches by the notifier's workers
+        if st.button("📢 SMS All Customers"):
+            queued = notifier.notify('sms', st.session_state.customers['Phone'].tolist(), business_name, f"New arrivals at {business_name} - visit us today!")
+            st.success(f"📢 {queued} SMS queued")
+        notify_stats = notifier.stats()
+        st.caption(f"📤 Outbox: {notify_stats['sent']} sent, {notify_stats['pending']} pending, {notify_stats['failed']} failed")
     
     with col2:
         st.markdown("### 📊 Customer Analytics")
         
         # Customer distribution by city
-        city_dist = st.session_state.customers['City'].value_counts().reset_index()
-        city_dist.columns = ['City', 'Customers']
-        
-        city_fig = px.bar(
-            city_dist,
-            x='City',
-            y='Customers', 
-            title='Customers by City',
-            color='Customers',
-            color_continuous_scale='Blues'
-        )
-        city_fig.update_layout(height=250)
+        customers_token = frame_token(st.session_state.customers)
+        def build_city_fig():
+            city_dist = st.session_state.customers['City'].value_counts().reset_index()
+            city_dist.columns = ['City', 'Customers']
+        
+            city_fig = px.bar(
+                city_dist,
+                x='City',
+                y='Customers', 
+                title='Customers by City',
+                color='Customers',
+                color_continuous_scale='Blues'
+            )
+            city_fig.update_layout(height=250)
+            return city_fig
+        city_fig = figure_cache.get('customer_cities', customers_token, build_city_fig)
         st.plotly_chart(city_fig, use_container_width=True)
         
         # Customer status distribution  
-        status_dist = st.session_state.customers['Status'].value_counts().reset_index()
-        status_dist.columns = ['Status', 'Count']
-        
-        status_fig = px.pie(
-            status_dist,
-            values='Count',
-            names='Status',
-            title='Customer Status Distribution'
-        )
-        status_fig.update_layout(height=250)
+        def build_status_fig():
+            status_dist = st.session_state.customers['Status'].value_counts().reset_index()
+            status_dist.columns = ['Status', 'Count']
+        
+            status_fig = px.pie(
+                status_dist,
+                values='Count',
+                names='Status',
+                title='Customer Status Distribution'
+            )
+            status_fig.update_layout(height=250)
+            return status_fig
+        status_fig = figure_cache.get('customer_status', customers_token, build_status_fig)
         st.plotly_chart(status_fig, use_container_width=True)
         
         st.markdown("### 🎯 Customer Insights")
@@ -1596,6 +1900,21 @@ with tab8:
         </div>
         """, unsafe_allow_html=True)
 
+# Page registry: only the selected page's code runs on each rerun
+PAGES = {
+    "📊 Dashboard": render_dashboard,
+    "📦 Inventory": render_inventory,
+    "🚚 Orders & Logistics": render_orders,
+    "📈 Analytics": render_analytics,
+    "🗣️ Customer Support": render_support,
+    "📸 Product Images": render_product_images,
+    "🏢 Suppliers": render_suppliers,
+    "👥 Customer Management": render_customers,
+}
+
+page = st.radio("Section", list(PAGES), horizontal=True, key="page", label_visibility="collapsed")
+PAGES[page]()
+
 # Enhanced Footer with System Status
 st.markdown("---")
 st.markdown(f"""
@@ -0,0 +1,56 @@
+"""Buffered SQLite writes shared by the order and chat stores.
+
+Items appended from the script thread are kept in memory and written
+together in one BEGIN IMMEDIATE transaction. That happens once batch_size
+items are buffered, flush_interval seconds after the first one, on an
+explicit flush(), or at interpreter exit. Subclasses implement
+_write(batch) and read their own unflushed items from self._pending under
+self._lock.
+"""
+import atexit
+import sqlite3
+import threading
+
+
+class BatchWriter:
+    def __init__(self, path, batch_size, flush_interval):
+        self._lock = threading.RLock()
+        self._path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending = []      # buffered but not yet written
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _buffer(self, item):
+        with self._lock:
+            self._pending.append(item)
+            if len(self._pending) >= self._batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write(self._pending)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending = []
+
+    def _write(self, batch):
+        # Runs inside the flush transaction
+        raise NotImplementedError
@@ -0,0 +1,66 @@
+"""Row-wise .apply vs classify.py on synthetic tables.
+
+Run from the repository root:  python benchmarks/bench_classify.py [rows ...]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classify import loyalty_level, stock_status, supplier_performance  # noqa: E402
+
+
+def apply_stock_status(df):
+    return df.apply(
+        lambda x: '🔴 Critical' if x['Stock'] < x['Min_Stock']
+        else '🟡 Low' if x['Stock'] < x['Min_Stock'] * 1.5
+        else '🟢 Good', axis=1
+    )
+
+
+def apply_loyalty_level(orders):
+    return orders.apply(
+        lambda x: '🌟 VIP' if x >= 15 else '💎 Premium' if x >= 10 else '🥉 Regular' if x >= 5 else '🆕 New'
+    )
+
+
+def apply_performance(rating):
+    return rating.apply(
+        lambda x: '🟢 Excellent' if x >= 4.5 else '🟡 Good' if x >= 4.0 else '🔴 Needs Improvement'
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>9} {'column':<14} {'apply':>9} {'vector':>9} {'speedup':>8}")
+    for n in sizes:
+        df = pd.DataFrame({
+            'Stock': rng.integers(0, 100, n),
+            'Min_Stock': rng.integers(1, 60, n),
+            'Total_Orders': rng.integers(0, 30, n),
+            'Rating': rng.uniform(3.0, 5.0, n).round(1),
+        })
+        cases = [
+            ('Stock_Status', lambda: apply_stock_status(df), lambda: stock_status(df['Stock'], df['Min_Stock'])),
+            ('Loyalty_Level', lambda: apply_loyalty_level(df['Total_Orders']), lambda: loyalty_level(df['Total_Orders'])),
+            ('Performance', lambda: apply_performance(df['Rating']), lambda: supplier_performance(df['Rating'])),
+        ]
+        for name, slow, fast in cases:
+            slow_s, expected = timed(slow)
+            fast_s, got = timed(fast)
+            assert (np.asarray(got, dtype=object) == expected.to_numpy()).all(), name
+            print(f"{n:>9} {name:<14} {slow_s:>8.3f}s {fast_s:>8.4f}s {slow_s / fast_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
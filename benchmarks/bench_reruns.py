@@ -0,0 +1,117 @@
+"""Rerun latency: a full-page rerun vs. a fragment rerun for the same click.
+
+Drives app.py with Streamlit's AppTest. For each interaction the same click
+is replayed two ways:
+
+- full rerun: the whole script runs with the click, which is what every
+  click cost before the handlers moved into fragments
+- fragment rerun: only the fragment that owns the widget runs, the way the
+  browser requests it (a rerun carrying that fragment's ID)
+
+AppTest itself always reruns the whole script, so the fragment rerun is
+requested by passing the fragment ID into the RerunData the test runner
+builds. AppTest also recompiles app.py on every run, which a server does
+once; one ScriptCache is shared across runs so neither column pays for
+compiling. Both columns time at.run() end to end, medians over [runs].
+
+Run from the repository root:  python benchmarks/bench_reruns.py [runs]
+"""
+import functools
+import logging
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner_utils.script_run_context import ThreadState
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+fragment_ids = {}       # fragment body name -> fragment ID of the current app
+fragment_runs = []      # fragment bodies run since the last clear
+rerun_fragment = None   # when set, the next at.run() reruns only this fragment
+_fragment = st.fragment
+_RerunData = local_script_runner.RerunData
+script_cache = ScriptCache()    # compiled app.py, reused like a server does
+
+
+def tracked_fragment(func=None, **kwargs):
+    # Stand-in for st.fragment that records each fragment's ID and runs
+    def decorate(body):
+        @functools.wraps(body)
+        def tracked(*args, **kw):
+            fragment_ids[body.__name__] = ThreadState.get().fragment_id
+            fragment_runs.append(body.__name__)
+            return body(*args, **kw)
+        return _fragment(tracked, **kwargs)
+    return decorate(func) if func else decorate
+
+
+def rerun_data(**kwargs):
+    # RerunData as the browser sends it for a click inside a fragment
+    return _RerunData(fragment_id=rerun_fragment, **kwargs)
+
+
+def send_chat(at):
+    at.text_input(key="chat_input").set_value("salam")
+    next(button for button in at.button if button.label == "📤 Send").click()
+
+
+def push_alert(at):
+    next(button for button in at.button if button.label == "🚨 Alert").click()
+
+
+def quick_search(at):
+    at.button(key="quick_iPhone").click()
+
+
+INTERACTIONS = [
+    ("chat send", "🗣️ Customer Support", send_chat, "render_chat"),
+    ("sidebar alert", None, push_alert, "render_quick_actions"),
+    ("quick search", "📦 Inventory", quick_search, "render_search_results"),
+]
+
+
+def timed_click(page, interact, fragment):
+    # Seconds for one at.run() carrying the click; fragment=None reruns the whole page
+    global rerun_fragment
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    if page:
+        at.radio(key="page").set_value(page).run()
+    interact(at)
+    fragment_runs.clear()
+    rerun_fragment = fragment_ids[fragment] if fragment else None
+    try:
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        rerun_fragment = None
+    assert not at.exception, [e.message for e in at.exception]
+    if fragment:
+        # Only the target fragment may have run
+        assert fragment_runs == [fragment], fragment_runs
+    return elapsed
+
+
+def main(runs):
+    print(f"{'interaction':<15} {'full rerun':>11} {'fragment':>10} {'speedup':>8}")
+    for name, page, interact, fragment in INTERACTIONS:
+        full = [timed_click(page, interact, None) for _ in range(runs)]
+        partial = [timed_click(page, interact, fragment) for _ in range(runs)]
+        full_ms = statistics.median(full) * 1000
+        fragment_ms = statistics.median(partial) * 1000
+        print(f"{name:<15} {full_ms:>9.1f}ms {fragment_ms:>8.1f}ms {full_ms / fragment_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    st.fragment = tracked_fragment
+    local_script_runner.RerunData = rerun_data
+    local_script_runner.ScriptCache = lambda: script_cache
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
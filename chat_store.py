@@ -0,0 +1,171 @@
+"""Support-chat transcripts shared by every session and worker process.
+
+Messages are appended to a SQLite table in data/luxemart.db (WAL), indexed
+by (conversation, position) so any page of a conversation is one range
+read. Writes are buffered and flushed in batches. Each flush also updates
+per-conversation and global aggregates in the same transaction. The Support
+Dashboard reads those counters and never rescans transcripts.
+
+Message positions are allocated inside the flush transaction (one past the
+conversation's highest stored position), so two tabs writing to the same
+conversation interleave their messages instead of colliding.
+
+Queue wait is the time from a customer's first unanswered message to the
+next reply in that conversation.
+"""
+import time
+
+import streamlit as st
+
+from batch_writer import BatchWriter
+from order_store import DB_PATH
+
+BATCH_SIZE = 50        # flush as soon as this many messages are buffered
+FLUSH_INTERVAL = 0.5   # ...or this many seconds after the first buffered message
+ACTIVE_WINDOW = 15 * 60  # a conversation is active if it had a message in this many seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT,
+    timestamp TEXT,
+    created REAL NOT NULL,
+    UNIQUE (conversation_id, position)
+);
+CREATE TABLE IF NOT EXISTS chat_conversations (
+    conversation_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    last_message REAL NOT NULL,
+    messages INTEGER NOT NULL DEFAULT 0,
+    waiting_since REAL
+);
+CREATE INDEX IF NOT EXISTS chat_conversations_last ON chat_conversations (last_message);
+CREATE TABLE IF NOT EXISTS chat_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    messages INTEGER NOT NULL DEFAULT 0,
+    user_messages INTEGER NOT NULL DEFAULT 0,
+    conversations INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    wait_seconds REAL NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO chat_totals (id) VALUES (1);
+"""
+
+MESSAGE_COLUMNS = ('role', 'content', 'timestamp')
+
+
+class ChatStore(BatchWriter):
+    def __init__(self, path=DB_PATH):
+        super().__init__(path, BATCH_SIZE, FLUSH_INTERVAL)
+        self._conn.executescript(SCHEMA)
+        # self._pending holds (conversation_id, message, created)
+
+    # -- writes ------------------------------------------------------------
+
+    def append(self, conversation_id, message):
+        # message: {'role', 'content', 'timestamp'}; durable after the next flush
+        self._buffer((conversation_id, message, time.time()))
+
+    def _write(self, batch):
+        conn = self._conn
+        messages = user_messages = conversations = replies = 0
+        wait_seconds = 0.0
+        for conversation_id, message, created in batch:
+            # Next free position, read and taken in the same transaction
+            conn.execute(
+                "INSERT INTO chat_messages (conversation_id, position, role, content, timestamp, created)"
+                " SELECT ?, COALESCE(MAX(position), -1) + 1, ?, ?, ?, ? FROM chat_messages WHERE conversation_id = ?",
+                (conversation_id, *(message.get(column) for column in MESSAGE_COLUMNS), created, conversation_id)
+            )
+            row = conn.execute(
+                "SELECT waiting_since FROM chat_conversations WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+            if row is None:
+                conversations += 1
+                waiting_since = None
+                conn.execute(
+                    "INSERT INTO chat_conversations (conversation_id, started, last_message) VALUES (?, ?, ?)",
+                    (conversation_id, created, created)
+                )
+            else:
+                waiting_since = row[0]
+            messages += 1
+            if message['role'] == 'user':
+                user_messages += 1
+                if waiting_since is None:
+                    waiting_since = created
+            elif waiting_since is not None:
+                replies += 1
+                wait_seconds += max(created - waiting_since, 0.0)
+                waiting_since = None
+            conn.execute(
+                "UPDATE chat_conversations SET last_message = ?, messages = messages + 1, waiting_since = ?"
+                " WHERE conversation_id = ?",
+                (created, waiting_since, conversation_id)
+            )
+        conn.execute(
+            "UPDATE chat_totals SET messages = messages + ?, user_messages = user_messages + ?,"
+            " conversations = conversations + ?, replies = replies + ?, wait_seconds = wait_seconds + ? WHERE id = 1",
+            (messages, user_messages, conversations, replies, wait_seconds)
+        )
+
+    # -- reads -------------------------------------------------------------
+
+    def _stored(self, conversation_id):
+        # Messages of one conversation already written
+        row = self._conn.execute(
+            "SELECT MAX(position) FROM chat_messages WHERE conversation_id = ?", (conversation_id,)
+        ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _buffered(self, conversation_id):
+        return [message for conv, message, _ in self._pending if conv == conversation_id]
+
+    def count(self, conversation_id):
+        # Messages in one conversation, including buffered ones
+        with self._lock:
+            return self._stored(conversation_id) + len(self._buffered(conversation_id))
+
+    def messages(self, conversation_id, start, stop):
+        # Messages at positions [start, stop) of one conversation, oldest first;
+        # buffered messages take the positions the next flush will give them
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT position, {', '.join(MESSAGE_COLUMNS)} FROM chat_messages"
+                " WHERE conversation_id = ? AND position >= ? AND position < ? ORDER BY position",
+                (conversation_id, start, stop)
+            ).fetchall()
+            found = {row[0]: dict(zip(MESSAGE_COLUMNS, row[1:])) for row in rows}
+            stored = self._stored(conversation_id)
+            for position, message in enumerate(self._buffered(conversation_id), stored):
+                if start <= position < stop:
+                    found[position] = dict(message)
+        return [found[position] for position in sorted(found)]
+
+    def stats(self, active_window=ACTIVE_WINDOW):
+        # Totals across all conversations, from the incrementally kept counters
+        self.flush()
+        with self._lock:
+            messages, user_messages, conversations, replies, wait_seconds = self._conn.execute(
+                "SELECT messages, user_messages, conversations, replies, wait_seconds FROM chat_totals WHERE id = 1"
+            ).fetchone()
+            active, waiting = self._conn.execute(
+                "SELECT COUNT(*), COUNT(waiting_since) FROM chat_conversations WHERE last_message >= ?",
+                (time.time() - active_window,)
+            ).fetchone()
+        return {
+            'messages': messages,
+            'user_messages': user_messages,
+            'conversations': conversations,
+            'active_conversations': active,
+            'waiting_conversations': waiting,
+            'avg_wait_seconds': wait_seconds / replies if replies else 0.0,
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_chat_store():
+    return ChatStore(DB_PATH)
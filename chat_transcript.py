@@ -0,0 +1,55 @@
+"""Bounded support-chat transcript for one conversation.
+
+The latest messages live in a fixed-size ring buffer in the session; every
+message is also written to the shared chat store (chat_store.py), which
+serves as the on-disk archive. Older pages are read back from the store by
+position on demand, and a conversation can be reopened (e.g. after a page
+refresh) from its ID.
+"""
+import uuid
+from collections import deque
+
+RECENT_MESSAGES = 50   # kept in memory per session
+PAGE_SIZE = 20         # messages shown at once; "load older" adds another page
+
+
+class ChatTranscript:
+    def __init__(self, store, conversation_id=None, capacity=RECENT_MESSAGES):
+        self._store = store
+        self.conversation_id = conversation_id or uuid.uuid4().hex
+        self._count = store.count(self.conversation_id) if conversation_id else 0
+        self._recent = deque(
+            store.messages(self.conversation_id, self._count - capacity, self._count),
+            maxlen=capacity
+        )
+
+    def append(self, message):
+        self._store.append(self.conversation_id, message)
+        self._recent.append(message)
+        self._count += 1
+
+    def clear(self):
+        # Starts a new conversation; the old one stays in the store
+        self.conversation_id = uuid.uuid4().hex
+        self._count = 0
+        self._recent.clear()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        # Recent messages only, e.g. transcript[-1]
+        return self._recent[position]
+
+    def archived(self, start, stop):
+        # Messages at positions [start, stop), oldest first, from the store
+        return self._store.messages(self.conversation_id, max(start, 0), stop)
+
+    def last(self, n):
+        # The newest n messages, oldest first; reaches into the store only if needed
+        recent = list(self._recent)[-n:] if n > 0 else []
+        missing = min(n, self._count) - len(recent)
+        if missing <= 0:
+            return recent
+        first_recent = self._count - len(recent)
+        return self.archived(first_recent - missing, first_recent) + recent
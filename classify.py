@@ -0,0 +1,29 @@
+"""Vectorized status labels shared by the Inventory, Suppliers and Customer tabs.
+
+Each function takes whole columns and returns a categorical Series, so a
+100k-row table is labelled with a handful of array operations instead of a
+Python call per row.
+"""
+import numpy as np
+import pandas as pd
+
+STOCK_STATUS_LABELS = ['🔴 Critical', '🟡 Low', '🟢 Good']
+LOYALTY_LABELS = ['🆕 New', '🥉 Regular', '💎 Premium', '🌟 VIP']
+PERFORMANCE_LABELS = ['🔴 Needs Improvement', '🟡 Good', '🟢 Excellent']
+
+
+def stock_status(stock, min_stock):
+    stock = np.asarray(stock)
+    min_stock = np.asarray(min_stock)
+    codes = np.select([stock < min_stock, stock < min_stock * 1.5], [0, 1], default=2)
+    return pd.Categorical.from_codes(codes, categories=STOCK_STATUS_LABELS)
+
+
+def loyalty_level(total_orders):
+    # Same thresholds as before: 15+ VIP, 10+ Premium, 5+ Regular, else New
+    return pd.cut(total_orders, bins=[-np.inf, 5, 10, 15, np.inf], right=False, labels=LOYALTY_LABELS)
+
+
+def supplier_performance(rating):
+    # 4.5+ Excellent, 4.0+ Good, anything lower needs improvement
+    return pd.cut(rating, bins=[-np.inf, 4.0, 4.5, np.inf], right=False, labels=PERFORMANCE_LABELS)
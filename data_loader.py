@@ -0,0 +1,209 @@
+"""Shared, typed loading of the CSV/JSON tables in data/.
+
+Every table is parsed once per process and handed to all sessions. The cache
+key includes the file's mtime, so editing a CSV (the README's "edit freely")
+reloads it on the next rerun without restarting the app.
+"""
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# Explicit dtypes per table: low-cardinality columns are categorical, counters
+# are narrow ints, and dates are parsed up front instead of on every use.
+TABLES = {
+    "products": {
+        "dtype": {
+            "sku": "string",
+            "name": "string",
+            "category": "category",
+            "price": "int64",
+            "stock": "int32",
+            "warehouse": "category",
+            "avg_daily_sales": "float32",
+            "reorder_point": "int32",
+            "reorder_qty": "int32",
+            "supplier_id": "category",
+        },
+        "parse_dates": ["received_date"],
+    },
+    "orders": {
+        "dtype": {
+            "order_id": "int64",
+            "city": "category",
+            "sku": "category",
+            "qty": "int32",
+            "status": "category",
+            "courier": "category",
+            "tracking": "string",
+        },
+        "parse_dates": ["date", "ship_date", "delivered_date"],
+    },
+    "shipments": {
+        "dtype": {
+            "shipment_id": "string",
+            "supplier_id": "category",
+            "status": "string",
+            "sku": "category",
+            "qty": "int32",
+            "received": "bool",
+            "on_time": "bool",
+        },
+        "parse_dates": ["eta"],
+    },
+    "suppliers": {
+        "dtype": {
+            "supplier_id": "string",
+            "name": "string",
+            "country": "category",
+            "lead_time_days": "int16",
+            "min_order_qty": "int32",
+            "contact": "string",
+            "phone": "string",      # optional; needed for WhatsApp
+        },
+        "parse_dates": [],
+    },
+    "cities": {
+        "dtype": {
+            "name": "string",
+            "lat": "float64",
+            "lon": "float64",
+        },
+        "parse_dates": [],
+    },
+    "warehouses": {
+        "dtype": {
+            "name": "string",
+            "temp_c": "float32",
+            "humidity": "float32",
+            "capacity": "int32",
+            "lat": "float64",
+            "lon": "float64",
+        },
+        "parse_dates": [],
+    },
+}
+
+
+def table_path(name):
+    return DATA_DIR / f"{name}.csv"
+
+
+def table_version(name):
+    # mtime in ns is the cache key; a missing file reads as version 0
+    try:
+        return os.stat(table_path(name)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def read_table(name):
+    # Uncached parse, also used by headless tools that run outside Streamlit
+    spec = TABLES[name]
+    return pd.read_csv(table_path(name), dtype=spec["dtype"], parse_dates=spec["parse_dates"])
+
+
+@st.cache_resource(show_spinner=False, max_entries=len(TABLES) * 2)
+def _cached_table(name, version):
+    return read_table(name)
+
+
+def load_table(name):
+    # Shared across sessions: treat the returned frame as read-only
+    return _cached_table(name, table_version(name))
+
+
+def load_products():
+    return load_table("products")
+
+
+def load_orders():
+    return load_table("orders")
+
+
+def load_shipments():
+    return load_table("shipments")
+
+
+def load_suppliers():
+    return load_table("suppliers")
+
+
+def load_warehouses():
+    return load_table("warehouses")
+
+
+def load_cities():
+    return load_table("cities")
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_settings(version):
+    with open(DATA_DIR / "settings.json", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_settings():
+    try:
+        version = os.stat(DATA_DIR / "settings.json").st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _cached_settings(version)
+
+
+def build_inventory(products, suppliers):
+    # Maps products.csv onto the column names the dashboard has always used
+    supplier_names = dict(zip(suppliers["supplier_id"], suppliers["name"]))
+    return pd.DataFrame({
+        "SKU": products["sku"],
+        "Product": products["name"],
+        "Stock": products["stock"],
+        "Min_Stock": products["reorder_point"],
+        "Daily_Sales": products["avg_daily_sales"],
+        "Price": products["price"],
+        "Supplier": products["supplier_id"].map(supplier_names).astype("category"),
+        "Category": products["category"],
+        "Warehouse": products["warehouse"],
+        "Reorder_Qty": products["reorder_qty"],
+        "Supplier_ID": products["supplier_id"],
+    })
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_inventory(products_version, suppliers_version):
+    return build_inventory(load_products(), load_suppliers())
+
+
+def load_inventory():
+    # One inventory frame per process, rebuilt when products/suppliers change
+    return _cached_inventory(table_version("products"), table_version("suppliers"))
+
+
+def build_supplier_view(suppliers, shipments):
+    # Rating is the supplier's on-time delivery share mapped onto 2.5-5.0
+    on_time = shipments.groupby("supplier_id", observed=True)["on_time"].mean()
+    rate = suppliers["supplier_id"].map(on_time).astype("float64")
+    rate = rate.fillna(shipments["on_time"].mean() if len(shipments) else 1.0)
+    return pd.DataFrame({
+        "Supplier_ID": suppliers["supplier_id"],
+        "Supplier": suppliers["name"],
+        "Location": suppliers["country"],
+        "Rating": (2.5 + 2.5 * rate).round(1),
+        "Lead_Time": suppliers["lead_time_days"],
+        "Min_Order_Qty": suppliers["min_order_qty"],
+        "Contact": suppliers["contact"],
+        "Phone": suppliers["phone"] if "phone" in suppliers else pd.NA,
+    })
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_supplier_view(suppliers_version, shipments_version):
+    return build_supplier_view(load_suppliers(), load_shipments())
+
+
+def load_supplier_view():
+    return _cached_supplier_view(table_version("suppliers"), table_version("shipments"))
@@ -0,0 +1,67 @@
+"""Order and product mentions in support chat messages.
+
+Order IDs ("LUX1242", "lux-1242", "order #1242") are normalized and fetched
+one by one through the order store's order_id index. SKUs are resolved
+through the inventory's SKU hash index; product names through the search
+index's word postings, narrowed from the message's rarest catalog word, so
+a message is matched against the catalog without scanning it.
+"""
+import re
+
+from order_ids import PREFIX, parse_order_id
+
+ORDER_ID_RE = re.compile(
+    r"\b" + PREFIX + r"\s*[-#]?\s*(\d+)\b"
+    r"|\border\s*(?:id|no\.?|number)?\s*[:#]?\s*(\d{3,})\b",
+    re.IGNORECASE,
+)
+SKU_RE = re.compile(r"\b[a-z0-9]+(?:-[a-z0-9]+)+\b", re.IGNORECASE)
+
+
+def order_ids(message):
+    # Distinct order IDs in the message, as LUX####, in order of appearance
+    found = []
+    for match in ORDER_ID_RE.finditer(message):
+        order_id = f"{PREFIX}{parse_order_id(match.group(1) or match.group(2))}"
+        if order_id not in found:
+            found.append(order_id)
+    return found
+
+
+def sku_candidates(message):
+    # Hyphenated tokens that look like SKUs (IP-COVER-BLK), upper-cased
+    return list(dict.fromkeys(token.upper() for token in SKU_RE.findall(message)))
+
+
+class EntityResolver:
+    def __init__(self, inventory_service, search_index, order_store):
+        self._inventory = inventory_service
+        self._search_index = search_index
+        self._orders = order_store
+
+    def orders(self, message):
+        # ({order_id: order}, [order IDs not found])
+        found, missing = {}, []
+        for order_id in order_ids(message):
+            order = self._orders.get(order_id)
+            if order is None:
+                missing.append(order_id)
+            else:
+                found[order_id] = order
+        return found, missing
+
+    def products(self, message):
+        # Inventory labels: exact SKUs if any are given, else the best name matches
+        labels = [self._inventory.lookup(sku=sku) for sku in sku_candidates(message)]
+        labels = [label for label in labels if label is not None]
+        if labels:
+            return list(dict.fromkeys(labels))
+        return self._search_index.mentioned(message)
+
+    def resolve(self, message):
+        orders, missing = self.orders(message)
+        return {
+            'orders': orders,
+            'missing_orders': missing,
+            'products': self.products(message),
+        }
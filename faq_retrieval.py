@@ -0,0 +1,139 @@
+"""Offline FAQ and product retrieval for the support chat.
+
+The FAQ entries in data/faq.json (questions, answers, policies) and one
+short description per product in data/products.csv are turned into a
+TF-IDF matrix once: sublinear term frequency, smoothed IDF, rows
+normalized to unit length. The matrix is stored in compressed sparse
+column form, i.e. each term keeps the documents it occurs in and their
+weights. A message is scored with one sparse matrix-vector product that
+touches only its own terms' columns: scores are accumulated for the
+documents in those columns and the top k are picked among them. Cost
+depends on the length of the message's posting lists, not on the corpus
+size. No network is needed.
+"""
+import json
+import os
+import re
+
+import numpy as np
+import streamlit as st
+
+from data_loader import DATA_DIR, load_products, table_version
+
+FAQ_PATH = DATA_DIR / "faq.json"
+MIN_SCORE = 0.15    # cosine similarity needed to answer from the corpus
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# English and Roman-Urdu filler words that say nothing about the topic
+STOPWORDS = frozenset("""
+a an and are can do does for how i is it me my of on or the to what when where which with you your
+aap ap hai hain ho hoga hota kaise kar karein karna ke ki kya ka ko main mein mujhe se tak yeh wo
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+class TfidfIndex:
+    def __init__(self, documents):
+        self.vocabulary = {}
+        doc_ids, term_ids = [], []
+        for doc_id, text in enumerate(documents):
+            for token in tokenize(text):
+                doc_ids.append(doc_id)
+                term_ids.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+        self.size = len(documents)
+        n_terms = len(self.vocabulary)
+        # Term counts per (document, term) pair
+        pairs, counts = np.unique(
+            np.array(doc_ids, dtype=np.int64) * max(n_terms, 1) + np.array(term_ids, dtype=np.int64),
+            return_counts=True
+        )
+        docs, terms = np.divmod(pairs, max(n_terms, 1))
+        document_frequency = np.bincount(terms, minlength=n_terms)
+        self.idf = np.log((1 + self.size) / (1 + document_frequency)) + 1.0
+        weights = (1.0 + np.log(counts)) * self.idf[terms]
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=self.size))
+        weights /= norms[docs]
+        # Compressed sparse column layout: column t is indices/data[indptr[t]:indptr[t + 1]]
+        order = np.lexsort((docs, terms))
+        self.indices = docs[order]
+        self.data = weights[order]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(terms, minlength=n_terms))))
+
+    def query_vector(self, text):
+        # (term ids, weights) of the unit-length query vector; unknown words are dropped
+        counts = {}
+        for token in tokenize(text):
+            term = self.vocabulary.get(token)
+            if term is not None:
+                counts[term] = counts.get(term, 0) + 1
+        terms = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * self.idf[terms]
+        norm = np.sqrt((weights ** 2).sum())
+        return terms, weights / norm if norm else weights
+
+    def scores(self, text):
+        # (documents, cosine similarities) for the documents sharing a term with text
+        terms, weights = self.query_vector(text)
+        if not len(terms):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        starts, ends = self.indptr[terms], self.indptr[terms + 1]
+        lengths = ends - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        # Accumulate over the touched documents only, not the whole corpus
+        docs, inverse = np.unique(self.indices[positions], return_inverse=True)
+        return docs, np.bincount(inverse, weights=self.data[positions] * np.repeat(weights, lengths))
+
+    def top(self, text, k):
+        # [(document, score), ...] for the k best documents with a positive score
+        docs, scores = self.scores(text)
+        if k <= 0 or not len(docs):
+            return []
+        if k < len(docs):
+            best = np.argpartition(-scores, k - 1)[:k]
+            docs, scores = docs[best], scores[best]
+        order = np.lexsort((docs, -scores))
+        return [(int(doc), float(score)) for doc, score in zip(docs[order], scores[order]) if score > 0]
+
+
+def product_document(product):
+    # Searchable description of one catalog row
+    return f"{product['name']} {product['sku'].replace('-', ' ')} {product['category']} price stock {product['warehouse']}"
+
+
+class FaqRetriever:
+    def __init__(self, faqs, products, version=None):
+        # Entries: FAQ dicts (kind 'faq') followed by one per product (kind 'product', with its SKU)
+        self.version = version  # versions of the files the corpus was built from
+        self.entries = [dict(faq, kind='faq') for faq in faqs]
+        self.entries += [{'kind': 'product', 'sku': sku} for sku in products['sku']]
+        documents = [f"{faq['question']} {faq['answer']} {faq.get('tags', '')}" for faq in faqs]
+        documents += [product_document(product) for product in products.to_dict('records')]
+        self.index = TfidfIndex(documents)
+
+    def common_questions(self):
+        return [entry for entry in self.entries if entry.get('common')]
+
+    def search(self, message, k=3, min_score=MIN_SCORE):
+        # [(entry, score), ...] best first
+        return [(self.entries[doc], score) for doc, score in self.index.top(message, k) if score >= min_score]
+
+
+def read_faqs(path=FAQ_PATH):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_retriever(faq_version, products_version):
+    return FaqRetriever(read_faqs() if faq_version else [], load_products(), (faq_version, products_version))
+
+
+def get_faq_retriever():
+    # Rebuilt only when data/faq.json or data/products.csv changes
+    try:
+        faq_version = os.stat(FAQ_PATH).st_mtime_ns
+    except FileNotFoundError:
+        faq_version = 0
+    return _cached_retriever(faq_version, table_version("products"))
@@ -0,0 +1,32 @@
+"""Process-wide cache of built Plotly figures.
+
+Building a figure with plotly.express (validation, trace and layout
+construction) costs far more than handing an existing one to
+st.plotly_chart, so figures are kept per (chart name, data token) and only
+rebuilt when their source data changes. The token is either a version
+counter the source already maintains or a content hash of the DataFrame.
+"""
+import pandas as pd
+import streamlit as st
+
+from lru import LRUCache
+
+MAX_FIGURES = 128
+
+
+def frame_token(frame):
+    # Content hash of a DataFrame, for sources without a version counter
+    return (frame.shape, int(pd.util.hash_pandas_object(frame, index=True).sum()))
+
+
+class FigureCache(LRUCache):
+    def __init__(self, max_entries=MAX_FIGURES):
+        super().__init__(max_entries)
+
+    def get(self, name, token, build):
+        return self.get_or_build((name, token), build)
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache()
@@ -0,0 +1,114 @@
+"""Keyword intent classification for the support chat.
+
+Every intent's keywords (English and Roman-Urdu) and extra patterns come from
+data/intents.json and are compiled into one regular expression with a named
+group per intent, so a message is classified in a single left-to-right scan.
+Keywords match whole words only ("hi" no longer fires inside "shipping");
+keywords of four letters or more also tolerate a plural "s"/"es", so "his"
+is not a greeting. Each hit scores one point for its intent. Ties go to the
+intent with the longest (most specific) matched keyword, so in "delivery
+kitne din mein" delivery beats the generic "kitne", and then to the intent
+listed first in the file.
+
+`python intents.py` checks EXAMPLES against data/intents.json.
+"""
+import json
+import os
+import re
+import sys
+
+import streamlit as st
+
+from data_loader import DATA_DIR
+
+INTENTS_PATH = DATA_DIR / "intents.json"
+PLURAL_MIN_LENGTH = 4   # shorter keywords ('hi', 'lux') match only as written
+
+# Regression cases: message -> expected best intent (None: no intent)
+EXAMPLES = [
+    ("delivery kitne din mein", "delivery"),
+    ("Delivery charges kitne?", "delivery"),
+    ("charger ki price kitne ki hai", "price"),
+    ("kitne paise lagenge", "price"),
+    ("his", None),
+    ("hi", "greeting"),
+    ("free shipping?", "delivery"),
+    ("where are my orders", "order"),
+    ("LUX1234 kahan hai", "order"),
+]
+
+
+def _keyword_pattern(keyword):
+    # 'thank you' also matches 'thank  you'; 'order' also matches 'orders'
+    words = [re.escape(word) for word in keyword.lower().split()]
+    plural = r"(?:e?s)?" if len(keyword) >= PLURAL_MIN_LENGTH else ""
+    return r"\b" + r"\s+".join(words) + plural + r"\b"
+
+
+class IntentMatcher:
+    def __init__(self, intents):
+        # intents: {name: {"keywords": [...], "patterns": [regex, ...]}}, in priority order
+        self.names = list(intents)
+        groups = []
+        for name, spec in intents.items():
+            keywords = sorted(spec.get("keywords", []), key=len, reverse=True)
+            alternatives = [_keyword_pattern(keyword) for keyword in keywords]
+            alternatives += [r"\b(?:" + pattern + r")\b" for pattern in spec.get("patterns", [])]
+            if alternatives:
+                groups.append(f"(?P<{name}>{'|'.join(alternatives)})")
+        self._regex = re.compile("|".join(groups) or r"(?!)", re.IGNORECASE)
+
+    def matches(self, message):
+        # {intent: (hits, longest matched text)} for every intent found in the message
+        found = {}
+        for match in self._regex.finditer(message):
+            hits, longest = found.get(match.lastgroup, (0, 0))
+            found[match.lastgroup] = (hits + 1, max(longest, len(match.group())))
+        return found
+
+    def scores(self, message):
+        # {intent: hits} for every intent found in the message
+        return {name: hits for name, (hits, _) in self.matches(message).items()}
+
+    def classify(self, message):
+        # [(intent, hits), ...] best first; ties go to the longest match, then the file's order
+        found = self.matches(message)
+        ranked = sorted(found, key=lambda name: (-found[name][0], -found[name][1], self.names.index(name)))
+        return [(name, found[name][0]) for name in ranked]
+
+    def best(self, message):
+        ranked = self.classify(message)
+        return ranked[0][0] if ranked else None
+
+
+def read_intents(path=INTENTS_PATH):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_matcher(version):
+    return IntentMatcher(read_intents() if version else {})
+
+
+def get_intent_matcher():
+    # Recompiled only when data/intents.json changes
+    try:
+        version = os.stat(INTENTS_PATH).st_mtime_ns
+    except FileNotFoundError:
+        version = 0
+    return _cached_matcher(version)
+
+
+def main():
+    matcher = IntentMatcher(read_intents())
+    failures = [(message, expected, matcher.best(message)) for message, expected in EXAMPLES
+                if matcher.best(message) != expected]
+    for message, expected, got in failures:
+        print(f"FAIL {message!r}: expected {expected}, got {got}")
+    print(f"{len(EXAMPLES) - len(failures)}/{len(EXAMPLES)} examples pass")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
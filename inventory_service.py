@@ -0,0 +1,289 @@
+"""Process-wide inventory shared by all sessions.
+
+All row changes go through the service so that derived indexes (low stock,
+product search) are updated for the touched rows only, never by rescanning
+the catalog.
+
+Stock itself lives in the shared order database (data/luxemart.db), next to
+the orders it was sold to. A reservation is one conditional UPDATE
+(`stock = stock - n WHERE stock >= n`) inside a BEGIN IMMEDIATE
+transaction, so sessions, processes and restarts can never both sell the
+last unit. Each change bumps a row's `updated` counter. Every process pulls
+the rows changed since its last sync into its in-memory frame. Editing a
+stock figure in products.csv applies the difference to the stored stock,
+so units already sold stay sold.
+"""
+import sqlite3
+import threading
+
+import numpy as np
+import streamlit as st
+
+from data_loader import load_inventory, load_shipments, table_version
+from low_stock import LowStockIndex
+from order_store import DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stock (
+    sku TEXT PRIMARY KEY,
+    stock INTEGER NOT NULL,
+    base INTEGER NOT NULL,
+    updated INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stock_updated ON stock (updated);
+CREATE TABLE IF NOT EXISTS receipts (
+    shipment_id TEXT PRIMARY KEY,
+    sku TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    received TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class InsufficientStock(Exception):
+    def __init__(self, label, requested, available):
+        super().__init__(f"requested {requested}, only {available} available")
+        self.label = label
+        self.requested = requested
+        self.available = available
+
+
+class StockLedger:
+    # Units on hand per SKU in SQLite; base is the products.csv figure last applied
+    def __init__(self, path=DB_PATH):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.synced = 0         # highest `updated` counter seen by this process
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def _next_counter(self):
+        return self._conn.execute("SELECT COALESCE(MAX(updated), 0) + 1 FROM stock").fetchone()[0]
+
+    def load(self, skus, stock):
+        # Seed new SKUs, apply products.csv edits as deltas; returns {sku: stock on hand}
+        def work():
+            counter = self._next_counter()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO stock (sku, stock, base, updated) VALUES (?, ?, ?, ?)",
+                [(sku, units, units, counter) for sku, units in zip(skus, stock)]
+            )
+            self._conn.executemany(
+                "UPDATE stock SET stock = stock + (? - base), base = ?, updated = ? WHERE sku = ? AND base != ?",
+                [(units, units, counter, sku, units) for sku, units in zip(skus, stock)]
+            )
+            return dict(self._conn.execute("SELECT sku, stock FROM stock").fetchall()), counter
+        on_hand, self.synced = self._transaction(work)
+        return on_hand
+
+    def take(self, sku, quantity):
+        # Atomic check-and-decrement; returns (taken, stock left or available)
+        def work():
+            taken = self._conn.execute(
+                "UPDATE stock SET stock = stock - ?, updated = (SELECT COALESCE(MAX(updated), 0) + 1 FROM stock) "
+                "WHERE sku = ? AND stock >= ?",
+                (quantity, sku, quantity)
+            ).rowcount == 1
+            left = self._conn.execute("SELECT stock FROM stock WHERE sku = ?", (sku,)).fetchone()
+            return taken, left[0] if left else 0
+        return self._transaction(work)
+
+    def add(self, sku, quantity):
+        # Receipts and released reservations; returns the new stock
+        def work():
+            self._conn.execute(
+                "UPDATE stock SET stock = stock + ?, updated = (SELECT COALESCE(MAX(updated), 0) + 1 FROM stock) "
+                "WHERE sku = ?",
+                (quantity, sku)
+            )
+            return self._conn.execute("SELECT stock FROM stock WHERE sku = ?", (sku,)).fetchone()[0]
+        return self._transaction(work)
+
+    def receive(self, shipment_id, sku, quantity):
+        # Book an inbound shipment once; returns the new stock, or None if it was already booked
+        def work():
+            booked = self._conn.execute(
+                "INSERT OR IGNORE INTO receipts (shipment_id, sku, quantity) VALUES (?, ?, ?)",
+                (shipment_id, sku, quantity)
+            ).rowcount == 1
+            if not booked:
+                return None
+            self._conn.execute(
+                "UPDATE stock SET stock = stock + ?, updated = (SELECT COALESCE(MAX(updated), 0) + 1 FROM stock) "
+                "WHERE sku = ?",
+                (quantity, sku)
+            )
+            return self._conn.execute("SELECT stock FROM stock WHERE sku = ?", (sku,)).fetchone()[0]
+        return self._transaction(work)
+
+    def received(self):
+        with self._lock:
+            return frozenset(row[0] for row in self._conn.execute("SELECT shipment_id FROM receipts"))
+
+    def changes(self):
+        # [(sku, stock)] changed by any process since the last call
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sku, stock, updated FROM stock WHERE updated > ? ORDER BY updated", (self.synced,)
+            ).fetchall()
+            if rows:
+                self.synced = rows[-1][2]
+        return [(sku, stock) for sku, stock, _ in rows]
+
+
+class InventoryService:
+    def __init__(self, frame, key=None, ledger=None):
+        # ledger: a StockLedger makes stock durable and shared across processes;
+        # without one (headless tools, benchmarks) stock changes stay in memory
+        self._ledger = ledger
+        self._received = set()      # shipment IDs booked in memory when there is no ledger
+        if ledger is not None:
+            on_hand = ledger.load(frame['SKU'].astype(str).tolist(), frame['Stock'].astype(int).tolist())
+            frame['Stock'] = frame['SKU'].astype(str).map(on_hand).astype(frame['Stock'].dtype)
+        self.frame = frame
+        # key identifies the data/ files this frame was built from; indexes
+        # cached per service use it as their cache key
+        self.key = key
+        self.version = 0
+        self.low_stock = LowStockIndex(frame)
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._row_locks = {}
+        # Hash indexes for the form/chat lookups instead of full-column comparisons
+        self._by_sku = dict(zip(frame['SKU'], frame.index))
+        self._by_product = dict(zip(frame['Product'], frame.index))
+
+    def subscribe(self, callback):
+        # callback(labels, columns) runs after every change, under the service lock
+        self._listeners.append(callback)
+
+    def _row_lock(self, label):
+        lock = self._row_locks.get(label)
+        if lock is None:
+            with self._lock:
+                lock = self._row_locks.setdefault(label, threading.Lock())
+        return lock
+
+    def lookup(self, product=None, sku=None):
+        # Row label for a product name or SKU, or None
+        if sku is not None:
+            return self._by_sku.get(sku)
+        return self._by_product.get(product)
+
+    def stock(self, label):
+        return int(self.frame.at[label, 'Stock'])
+
+    def reserve(self, label, quantity):
+        # Atomically take quantity units; returns what is left or raises InsufficientStock
+        with self._row_lock(label):
+            if self._ledger is not None:
+                taken, left = self._ledger.take(str(self.frame.at[label, 'SKU']), quantity)
+                self.frame.at[label, 'Stock'] = left
+                if not taken:
+                    raise InsufficientStock(label, quantity, left)
+            else:
+                available = int(self.frame.at[label, 'Stock'])
+                if quantity > available:
+                    raise InsufficientStock(label, quantity, available)
+                left = self.frame.at[label, 'Stock'] = available - quantity
+        self._notify([label], ('Stock',))
+        return left
+
+    def adjust_stock(self, label, delta):
+        # Positive delta for shipment receipts or released reservations
+        with self._row_lock(label):
+            if self._ledger is not None:
+                self.frame.at[label, 'Stock'] = self._ledger.add(str(self.frame.at[label, 'SKU']), delta)
+            else:
+                self.frame.at[label, 'Stock'] += delta
+        self._notify([label], ('Stock',))
+
+    def release(self, label, quantity):
+        # Give back a reservation whose order was never stored
+        self.adjust_stock(label, quantity)
+
+    def sync(self):
+        # Pull stock changed by other processes since the last sync
+        if self._ledger is None:
+            return
+        labels = []
+        for sku, stock in self._ledger.changes():
+            label = self._by_sku.get(sku)
+            if label is not None and self.frame.at[label, 'Stock'] != stock:
+                with self._row_lock(label):
+                    self.frame.at[label, 'Stock'] = stock
+                labels.append(label)
+        if labels:
+            self._notify(labels, ('Stock',))
+
+    def receive(self, shipment_id, sku, quantity):
+        # Put an inbound shipment on the shelf once; returns the row label, or None if already booked
+        label = self._by_sku.get(sku)
+        if label is None:
+            return None
+        with self._row_lock(label):
+            if self._ledger is not None:
+                stock = self._ledger.receive(shipment_id, sku, quantity)
+                if stock is None:
+                    return None
+                self.frame.at[label, 'Stock'] = stock
+            else:
+                if shipment_id in self._received:
+                    return None
+                self._received.add(shipment_id)
+                self.frame.at[label, 'Stock'] += quantity
+        self._notify([label], ('Stock',))
+        return label
+
+    def received_shipments(self):
+        # IDs of shipments booked through receive(), by any process
+        return self._ledger.received() if self._ledger is not None else frozenset(self._received)
+
+    def set_column(self, column, values):
+        # Bulk replace of a derived column (e.g. forecast Daily_Sales)
+        with self._lock:
+            self.frame[column] = np.asarray(values, dtype=self.frame[column].dtype)
+        self._notify(list(self.frame.index), (column,))
+
+    def _notify(self, labels, columns):
+        with self._lock:
+            self.version += 1
+            if 'Stock' in columns or 'Min_Stock' in columns:
+                self.low_stock.refresh(labels)
+            for callback in self._listeners:
+                callback(labels, columns)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_service(products_version, suppliers_version):
+    return InventoryService(load_inventory().copy(), key=(products_version, suppliers_version), ledger=StockLedger(DB_PATH))
+
+
+def get_inventory_service():
+    service = _cached_service(table_version("products"), table_version("suppliers"))
+    service.sync()
+    return service
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_shipments(shipments_version, received):
+    shipments = load_shipments()
+    if not received:
+        return shipments
+    return shipments.assign(received=shipments['received'] | shipments['shipment_id'].isin(list(received)))
+
+
+def current_shipments(service):
+    # data/shipments.csv with shipments booked through the service marked received
+    return _cached_shipments(table_version("shipments"), service.received_shipments())
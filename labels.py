@@ -0,0 +1,99 @@
+"""Courier label files (TCS, Leopards, BlueEx) for orders ready to ship.
+
+Orders are read from the order store in fixed-size chunks, turned into
+label rows one chunk at a time (vectorized per chunk) and appended to the
+output file. Memory use is therefore set by the chunk size, not by the
+number of orders. A ZIP holds one CSV per courier; each member is streamed
+to a temporary file first and then copied into the archive in blocks.
+
+Orders without a courier are spread over the configured couriers by order
+number. Missing tracking numbers are derived from the courier prefix and
+the order number, so regenerating a batch yields the same labels.
+"""
+import csv
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR
+from order_ids import PREFIX
+
+LABELS_DIR = DATA_DIR / "labels"
+READY_STATUSES = ('Pending', 'Processing', 'Confirmed')
+CHUNK_SIZE = 5000
+TRACKING_PREFIXES = {'TCS': 'TCS', 'Leopards': 'LEO', 'BlueEx': 'BEX'}
+LABEL_COLUMNS = [
+    'Courier', 'Tracking', 'Order_ID', 'Created', 'Customer', 'City',
+    'SKU', 'Product', 'Quantity', 'COD_Amount', 'Origin',
+]
+
+
+def label_rows(orders, catalog, couriers):
+    # orders: order-store frame; catalog: inventory indexed by SKU (Price, Warehouse)
+    numbers = orders['Order_ID'].str.slice(len(PREFIX)).astype(np.int64).to_numpy()
+    assigned = np.asarray(couriers, dtype=object)[numbers % len(couriers)]
+    courier = orders['Courier'].where(orders['Courier'].notna(), pd.Series(assigned, index=orders.index))
+    prefix = courier.map(TRACKING_PREFIXES).fillna(courier.str.upper().str.slice(0, 3))
+    tracking = orders['Tracking'].where(orders['Tracking'].notna(), prefix + '-' + pd.Series(numbers, index=orders.index).map('{:07d}'.format))
+    price = orders['SKU'].map(catalog['Price']).fillna(0)
+    return pd.DataFrame({
+        'Courier': courier,
+        'Tracking': tracking,
+        'Order_ID': orders['Order_ID'],
+        'Created': orders['Created'],
+        'Customer': orders['Customer'].fillna(''),
+        'City': orders['City'],
+        'SKU': orders['SKU'],
+        'Product': orders['Product'],
+        'Quantity': orders['Quantity'],
+        'COD_Amount': (orders['Quantity'] * price).astype(np.int64),
+        'Origin': orders['SKU'].map(catalog['Warehouse']).astype(object).fillna(''),
+    }, columns=LABEL_COLUMNS)
+
+
+def iter_labels(order_store, inventory, couriers, only=None, chunk_size=CHUNK_SIZE):
+    # Label frames, one per chunk of ready orders; only limits the couriers
+    catalog = inventory.set_index('SKU')[['Price', 'Warehouse']]
+    for orders in order_store.iter_frames(READY_STATUSES, chunk_size):
+        labels = label_rows(orders, catalog, couriers)
+        if only:
+            labels = labels[labels['Courier'].isin(only)]
+        if not labels.empty:
+            yield labels
+
+
+def write_csv(label_chunks, path):
+    # One CSV for all couriers; returns the number of labels written
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        csv.writer(fh).writerow(LABEL_COLUMNS)
+        for labels in label_chunks:
+            labels.to_csv(fh, header=False, index=False)
+            count += len(labels)
+    return count
+
+
+def write_zip(label_chunks, path):
+    # One CSV per courier inside a ZIP; returns {courier: labels written}
+    counts = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        files = {}
+        try:
+            for labels in label_chunks:
+                for courier, rows in labels.groupby('Courier', sort=False):
+                    fh = files.get(courier)
+                    if fh is None:
+                        fh = files[courier] = open(Path(scratch) / f"{courier}.csv", 'w', newline='', encoding='utf-8')
+                        csv.writer(fh).writerow(LABEL_COLUMNS)
+                    rows.to_csv(fh, header=False, index=False)
+                    counts[courier] = counts.get(courier, 0) + len(rows)
+        finally:
+            for fh in files.values():
+                fh.close()
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for courier in files:
+                archive.write(Path(scratch) / f"{courier}.csv", arcname=f"{courier}_labels.csv")
+    return counts
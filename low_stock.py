@@ -0,0 +1,40 @@
+"""Incrementally maintained set of rows whose Stock is below Min_Stock.
+
+Labels are kept in a sorted list (catalog order), so a stock change costs a
+binary search plus one insert or delete, and reads never re-sort.
+"""
+import bisect
+
+
+class LowStockIndex:
+    def __init__(self, inventory):
+        self._inventory = inventory
+        # One vectorized pass at build time; afterwards only touched rows are rechecked
+        low = inventory['Stock'].to_numpy() < inventory['Min_Stock'].to_numpy()
+        self._labels = sorted(inventory.index[low])
+
+    def refresh(self, labels):
+        stock = self._inventory['Stock']
+        min_stock = self._inventory['Min_Stock']
+        for label in labels:
+            position = bisect.bisect_left(self._labels, label)
+            present = position < len(self._labels) and self._labels[position] == label
+            if stock.at[label] < min_stock.at[label]:
+                if not present:
+                    self._labels.insert(position, label)
+            elif present:
+                del self._labels[position]
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __contains__(self, label):
+        position = bisect.bisect_left(self._labels, label)
+        return position < len(self._labels) and self._labels[position] == label
+
+    def labels(self):
+        # Catalog order, so alerts render in the same order as the inventory table
+        return list(self._labels)
+
+    def frame(self):
+        return self._inventory.loc[self._labels]
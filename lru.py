@@ -0,0 +1,29 @@
+"""Small thread-safe LRU shared by the process-wide figure and answer caches.
+
+Values are built outside the lock, so a slow build never blocks readers of
+other keys; two sessions missing the same key at once may both build it,
+and the later one wins.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self._max_entries = max_entries
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        # Cached values are shared between sessions: treat them as read-only
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self._values.move_to_end(key)
+                return value
+        value = build()
+        with self._lock:
+            self._values[key] = value
+            if len(self._values) > self._max_entries:
+                self._values.popitem(last=False)
+        return value
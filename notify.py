@@ -0,0 +1,187 @@
+"""Outbound email/SMS/WhatsApp notifications off the Streamlit script thread.
+
+Buttons only enqueue messages, so notifying a thousand customers returns
+immediately. A small pool of worker threads drains the queue in batches,
+grouped per channel, and hands each batch to a transport. A failed batch is
+retried with exponential backoff on a timer, not by sleeping in a worker;
+after MAX_ATTEMPTS its messages are kept as dead letters.
+
+The bundled transport is a local stand-in for SMTP/SMS gateways: it appends
+each batch to data/outbox/<channel>.jsonl. Anything with a
+send(channel, messages) method can replace it.
+"""
+import atexit
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+
+from data_loader import DATA_DIR, load_settings
+
+OUTBOX_DIR = DATA_DIR / "outbox"
+CHANNELS = ('email', 'sms', 'whatsapp')
+WORKERS = 4
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+BACKOFF = 0.5          # seconds before the first retry; doubles per attempt
+DEAD_LETTERS = 1000    # failed messages kept for inspection
+PHONE_RE = re.compile(r"\+?[\d\s()-]{7,20}")   # '0300-1234567', '+92 300 1234567'
+
+
+class OutboxTransport:
+    # Local stand-in for an SMTP/SMS/WhatsApp gateway: one JSON line per message
+    def __init__(self, directory=OUTBOX_DIR):
+        self._directory = directory
+        self._lock = threading.Lock()
+
+    def send(self, channel, messages):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        lines = ''.join(json.dumps(message, ensure_ascii=False) + '\n' for message in messages)
+        with self._lock, open(self._directory / f"{channel}.jsonl", 'a', encoding='utf-8') as fh:
+            fh.write(lines)
+
+
+class NotificationQueue:
+    def __init__(self, transport, workers=WORKERS, batch_size=BATCH_SIZE,
+                 max_attempts=MAX_ATTEMPTS, backoff=BACKOFF):
+        self._transport = transport
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._retrying = 0
+        self.sent = 0
+        self.retried = 0
+        self.dead_letters = deque(maxlen=DEAD_LETTERS)
+        self._workers = [
+            threading.Thread(target=self._work, name=f"notify-{n}", daemon=True)
+            for n in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.drain, 5)
+
+    # -- producers ---------------------------------------------------------
+
+    def notify(self, channel, recipients, subject, body):
+        # Queue one message per recipient; returns how many were queued
+        if channel not in CHANNELS:
+            raise ValueError(f"unknown channel {channel!r}")
+        queued = datetime.now().isoformat(timespec='seconds')
+        count = 0
+        for recipient in recipients:
+            if recipient:
+                self._queue.put({
+                    'id': next(self._ids),
+                    'channel': channel,
+                    'to': recipient,
+                    'subject': subject,
+                    'body': body,
+                    'queued': queued,
+                    'attempts': 0,
+                })
+                count += 1
+        return count
+
+    # -- workers -----------------------------------------------------------
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            by_channel = {}
+            for message in batch:
+                by_channel.setdefault(message['channel'], []).append(message)
+            for channel, messages in by_channel.items():
+                self._deliver(channel, messages)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _deliver(self, channel, messages):
+        try:
+            self._transport.send(channel, messages)
+        except Exception as exc:
+            self._retry(messages, exc)
+        else:
+            with self._lock:
+                self.sent += len(messages)
+
+    def _retry(self, messages, error):
+        retry = []
+        for message in messages:
+            message['attempts'] += 1
+            if message['attempts'] >= self._max_attempts:
+                self.dead_letters.append(dict(message, error=repr(error)))
+            else:
+                retry.append(message)
+        if not retry:
+            return
+        with self._lock:
+            self.retried += len(retry)
+            self._retrying += len(retry)
+        delay = self._backoff * 2 ** (retry[0]['attempts'] - 1)
+        timer = threading.Timer(delay, self._requeue, (retry,))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue(self, messages):
+        for message in messages:
+            self._queue.put(message)
+        with self._lock:
+            self._retrying -= len(messages)
+
+    # -- status ------------------------------------------------------------
+
+    def pending(self):
+        # Queued, in flight or waiting for a retry
+        with self._lock:
+            return self._queue.unfinished_tasks + self._retrying
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': len(self.dead_letters),
+        }
+
+    def drain(self, timeout=None):
+        # Wait until nothing is pending (or timeout seconds pass); True if drained
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+def is_phone(value):
+    # SMS/WhatsApp recipients must be phone numbers, not emails or placeholders
+    return isinstance(value, str) and PHONE_RE.fullmatch(value.strip()) is not None
+
+
+def owner_contacts():
+    # Owner's email and phone from data/settings.json
+    settings = load_settings()
+    return settings.get('notify_email'), settings.get('notify_phone')
+
+
+@st.cache_resource(show_spinner=False)
+def get_notifier():
+    return NotificationQueue(OutboxTransport(OUTBOX_DIR))
@@ -0,0 +1,83 @@
+"""Collision-free order IDs (LUX1249, LUX1250, ...).
+
+Each process reserves a block of IDs from a counter row in the order
+database inside one short transaction, then hands them out from memory, so
+allocation is O(1) and the database is touched once per BLOCK_SIZE orders.
+Concurrent processes always receive disjoint blocks. The counter starts
+after the highest ID already in data/orders.csv or the order store.
+"""
+import sqlite3
+import threading
+
+import streamlit as st
+
+from data_loader import load_orders
+from order_store import DB_PATH
+
+PREFIX = "LUX"
+BLOCK_SIZE = 100
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS id_blocks (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)"
+
+
+def parse_order_id(order_id):
+    # 'LUX1242', 'lux1242' or '1242' -> 1242; anything else -> None
+    text = str(order_id).strip().upper()
+    if text.startswith(PREFIX):
+        text = text[len(PREFIX):]
+    return int(text) if text.isdigit() else None
+
+
+class OrderIdAllocator:
+    def __init__(self, path=DB_PATH, floor=0, name="orders"):
+        self._name = name
+        self._floor = floor
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0   # exclusive end of the reserved block
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+
+    def _highest_stored(self):
+        try:
+            row = self._conn.execute(
+                "SELECT MAX(CAST(SUBSTR(order_id, ?) AS INTEGER)) FROM orders WHERE order_id LIKE ?",
+                (len(PREFIX) + 1, PREFIX + '%')
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
+
+    def _reserve_block(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT next_id FROM id_blocks WHERE name = ?", (self._name,)).fetchone()
+            start = row[0] if row else max(self._floor, self._highest_stored()) + 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO id_blocks (name, next_id) VALUES (?, ?)",
+                (self._name, start + BLOCK_SIZE)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._next, self._end = start, start + BLOCK_SIZE
+
+    def allocate_number(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._reserve_block()
+            number = self._next
+            self._next += 1
+            return number
+
+    def allocate(self):
+        return f"{PREFIX}{self.allocate_number()}"
+
+
+@st.cache_resource(show_spinner=False)
+def get_order_id_allocator():
+    orders = load_orders()
+    floor = int(orders['order_id'].max()) if len(orders) else 0
+    return OrderIdAllocator(DB_PATH, floor=floor)
@@ -0,0 +1,243 @@
+"""Durable order history shared by every session and worker process.
+
+Orders live in an append-only SQLite table (WAL mode, so readers never block
+the writer) seeded once from data/orders.csv. append() buffers orders and
+writes them in batches; insert() writes one order before returning, for
+callers that must know it was stored (Create Order, which holds reserved
+stock for it). Reads pull only the rows committed since the last read and
+keep them as chunks, so showing recent orders never reloads the history.
+"""
+import sqlite3
+
+import pandas as pd
+import streamlit as st
+
+from batch_writer import BatchWriter
+from data_loader import DATA_DIR, load_orders, load_products
+
+DB_PATH = DATA_DIR / "luxemart.db"
+BATCH_SIZE = 50        # flush as soon as this many orders are buffered
+FLUSH_INTERVAL = 0.5   # ...or this many seconds after the first buffered order
+
+# Frame column -> SQLite column
+COLUMNS = {
+    'Order_ID': 'order_id',
+    'Created': 'created',
+    'Customer': 'customer',
+    'City': 'city',
+    'SKU': 'sku',
+    'Product': 'product',
+    'Quantity': 'quantity',
+    'Status': 'status',
+    'Courier': 'courier',
+    'Tracking': 'tracking',
+    'Delivery_Date': 'delivery_date',
+    'Ship_Date': 'ship_date',
+    'Delivered_Date': 'delivered_date',
+    'Warehouse': 'warehouse',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL UNIQUE,
+    created TEXT,
+    customer TEXT,
+    city TEXT,
+    sku TEXT,
+    product TEXT,
+    quantity INTEGER,
+    status TEXT,
+    courier TEXT,
+    tracking TEXT,
+    delivery_date TEXT,
+    ship_date TEXT,
+    delivered_date TEXT,
+    warehouse TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _date_text(values):
+    return values.dt.strftime('%Y-%m-%d').astype(object).where(values.notna(), None)
+
+
+def seed_rows(orders, products):
+    # data/orders.csv rows in the store's shape; order 1242 becomes LUX1242
+    names = dict(zip(products['sku'], products['name']))
+    frame = pd.DataFrame({
+        'Order_ID': 'LUX' + orders['order_id'].astype(str),
+        'Created': _date_text(orders['date']),
+        'Customer': None,
+        'City': orders['city'].astype(object),
+        'SKU': orders['sku'].astype(object),
+        'Product': orders['sku'].astype(object).map(names),
+        'Quantity': orders['qty'].astype(int),
+        'Status': orders['status'].astype(object),
+        'Courier': orders['courier'].astype(object),
+        'Tracking': orders['tracking'].astype(object),
+        'Delivery_Date': _date_text(orders['delivered_date']),
+        'Ship_Date': _date_text(orders['ship_date']),
+        'Delivered_Date': _date_text(orders['delivered_date']),
+    })
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
+
+
+class OrderStore(BatchWriter):
+    def __init__(self, path=DB_PATH, seed=None):
+        super().__init__(path, BATCH_SIZE, FLUSH_INTERVAL)
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        if seed is not None:
+            self._seed(seed)
+        self._chunks = []       # committed rows already read, oldest first
+        self._last_seq = 0
+        self.version = 0
+
+    def _migrate(self):
+        # Databases created before orders carried their fulfillment warehouse
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(orders)")}
+        if 'warehouse' not in existing:
+            try:
+                self._conn.execute("ALTER TABLE orders ADD COLUMN warehouse TEXT")
+            except sqlite3.OperationalError:
+                pass    # another process added it first
+
+    def _seed(self, seed):
+        # BEGIN IMMEDIATE so concurrent processes seed exactly once
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone()
+                if not done:
+                    self._insert(seed() if callable(seed) else seed)
+                    self._conn.execute("INSERT INTO meta (key, value) VALUES ('seeded', '1')")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert(self, orders):
+        # Returns how many rows were new; rows whose order_id is already stored are skipped
+        columns = ', '.join(COLUMNS.values())
+        placeholders = ', '.join('?' * len(COLUMNS))
+        return self._conn.executemany(
+            f"INSERT OR IGNORE INTO orders ({columns}) VALUES ({placeholders})",
+            [tuple(order.get(column) for column in COLUMNS) for order in orders]
+        ).rowcount
+
+    # -- writes ------------------------------------------------------------
+
+    def append(self, order):
+        # order: {frame column: value}; visible to readers immediately, durable after flush
+        with self._lock:
+            self.version += 1
+            self._buffer(order)
+
+    def insert(self, order):
+        # Write one order now (after anything buffered); False if its order_id is already stored
+        with self._lock:
+            self.flush()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                inserted = self._insert([order]) == 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if inserted:
+                self.version += 1
+            return inserted
+
+    def _write(self, batch):
+        self._insert(batch)
+
+    # -- reads -------------------------------------------------------------
+
+    def _sync(self):
+        # Pull only rows committed since the last read (by this or another process)
+        rows = self._conn.execute(
+            f"SELECT seq, {', '.join(COLUMNS.values())} FROM orders WHERE seq > ? ORDER BY seq",
+            (self._last_seq,)
+        ).fetchall()
+        if rows:
+            self._last_seq = rows[-1][0]
+            self._chunks.append(pd.DataFrame([row[1:] for row in rows], columns=list(COLUMNS)))
+            self.version += 1
+
+    def _pending_frame(self):
+        return pd.DataFrame(self._pending, columns=list(COLUMNS))
+
+    def frame(self):
+        # Full history; chunks are compacted into one frame on demand
+        with self._lock:
+            self._sync()
+            if len(self._chunks) > 1:
+                self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+            committed = self._chunks[0] if self._chunks else pd.DataFrame(columns=list(COLUMNS))
+            if not self._pending:
+                return committed
+            return pd.concat([committed, self._pending_frame()], ignore_index=True)
+
+    def recent(self, n):
+        # Last n orders, oldest first, touching only the chunks needed
+        with self._lock:
+            self._sync()
+            parts = [self._pending_frame().tail(n)] if self._pending else []
+            needed = n - len(parts[0]) if parts else n
+            for chunk in reversed(self._chunks):
+                if needed <= 0:
+                    break
+                parts.insert(0, chunk.tail(needed))
+                needed -= len(parts[0])
+            parts = [part for part in parts if not part.empty]
+            if not parts:
+                return pd.DataFrame(columns=list(COLUMNS))
+            return pd.concat(parts, ignore_index=True)
+
+    def get(self, order_id):
+        # One order as {column: value} through the order_id unique index, or None
+        with self._lock:
+            for order in reversed(self._pending):
+                if order.get('Order_ID') == order_id:
+                    return {column: order.get(column) for column in COLUMNS}
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS.values())} FROM orders WHERE order_id = ?", (order_id,)
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def iter_frames(self, statuses=None, chunk_size=5000):
+        # Orders (optionally only these statuses) as frames of up to chunk_size rows,
+        # read through a separate connection so memory stays bounded by one chunk
+        self.flush()
+        sql = f"SELECT {', '.join(COLUMNS.values())} FROM orders"
+        if statuses:
+            sql += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+        conn = sqlite3.connect(str(self._path), timeout=30)
+        try:
+            cursor = conn.execute(sql + " ORDER BY seq", tuple(statuses or ()))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=list(COLUMNS))
+        finally:
+            conn.close()
+
+    def current_version(self):
+        # version after picking up rows committed elsewhere; changes whenever the history does
+        with self._lock:
+            self._sync()
+            return self.version
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return sum(len(chunk) for chunk in self._chunks) + len(self._pending)
+
+
+@st.cache_resource(show_spinner=False)
+def get_order_store():
+    return OrderStore(DB_PATH, seed=lambda: seed_rows(load_orders(), load_products()))
@@ -0,0 +1,87 @@
+"""Batch reorder planning for low-stock SKUs.
+
+Quantities for every low-stock SKU are computed in one vectorized pass:
+enough to cover demand over the supplier's lead time and get back above the
+reorder point, never less than the product's reorder_qty or the supplier's
+minimum order quantity, net of stock already on the way (unreceived rows in
+data/shipments.csv). Lines are then grouped into one purchase order per
+supplier.
+
+The rule itself is order_quantities, a pure function over numpy arrays, so
+the simulator applies exactly the same rule to its own arrays every day.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+LINE_COLUMNS = [
+    'SKU', 'Product', 'Supplier_ID', 'Supplier', 'Stock', 'Inbound',
+    'Reorder_Point', 'Lead_Time', 'Daily_Sales', 'Order_Qty',
+]
+
+
+def inbound_quantities(shipments):
+    # Units per SKU on open (not yet received) inbound shipments
+    open_rows = shipments[~shipments['received']]
+    return open_rows.groupby(open_rows['sku'].astype(str))['qty'].sum()
+
+
+def order_quantities(stock, inbound, reorder_point, daily_sales, lead_time, reorder_qty, moq):
+    # Units to order per SKU (0 where none are needed); all arguments are aligned arrays
+    # Stock must last until the delivery lands and still be at the reorder point
+    shortfall = np.ceil(reorder_point + daily_sales * lead_time - stock - inbound)
+    return np.where(shortfall > 0, np.maximum.reduce([shortfall, reorder_qty, moq]), 0).astype(np.int64)
+
+
+def plan_reorders(inventory, suppliers, shipments, labels=None):
+    # One line per SKU that needs ordering; labels limits the pass (e.g. the low-stock index)
+    rows = inventory if labels is None else inventory.loc[labels]
+    if labels is None:
+        rows = rows[rows['Stock'].to_numpy() < rows['Min_Stock'].to_numpy()]
+    if rows.empty:
+        return pd.DataFrame(columns=LINE_COLUMNS)
+
+    supplier_ids = rows['Supplier_ID'].astype(str)
+    by_supplier = suppliers.set_index(suppliers['supplier_id'].astype(str))
+    lead_time = supplier_ids.map(by_supplier['lead_time_days']).fillna(0).to_numpy(dtype=np.float64)
+    moq = supplier_ids.map(by_supplier['min_order_qty']).fillna(0).to_numpy(dtype=np.float64)
+    inbound = rows['SKU'].astype(str).map(inbound_quantities(shipments)).fillna(0).to_numpy(dtype=np.float64)
+
+    stock = rows['Stock'].to_numpy(dtype=np.float64)
+    reorder_point = rows['Min_Stock'].to_numpy(dtype=np.float64)
+    daily_sales = rows['Daily_Sales'].to_numpy(dtype=np.float64)
+    quantity = order_quantities(
+        stock, inbound, reorder_point, daily_sales, lead_time,
+        rows['Reorder_Qty'].to_numpy(dtype=np.float64), moq
+    )
+
+    lines = pd.DataFrame({
+        'SKU': rows['SKU'].to_numpy(),
+        'Product': rows['Product'].to_numpy(),
+        'Supplier_ID': supplier_ids.to_numpy(),
+        'Supplier': rows['Supplier'].astype(str).to_numpy(),
+        'Stock': stock.astype(np.int64),
+        'Inbound': inbound.astype(np.int64),
+        'Reorder_Point': reorder_point.astype(np.int64),
+        'Lead_Time': lead_time.astype(np.int64),
+        'Daily_Sales': daily_sales,
+        'Order_Qty': quantity,
+    }, index=rows.index)
+    return lines[lines['Order_Qty'] > 0]
+
+
+def purchase_orders(lines, today=None):
+    # One PO per supplier: line count, total units and expected arrival
+    today = today or date.today()
+    if lines.empty:
+        return pd.DataFrame(columns=['PO', 'Supplier_ID', 'Supplier', 'Lines', 'Units', 'Expected'])
+    grouped = lines.groupby(['Supplier_ID', 'Supplier'], sort=True).agg(
+        Lines=('SKU', 'size'),
+        Units=('Order_Qty', 'sum'),
+        Lead_Time=('Lead_Time', 'max'),
+    ).reset_index()
+    stamp = today.strftime('%Y%m%d')
+    grouped.insert(0, 'PO', [f"PO-{stamp}-{supplier_id}" for supplier_id in grouped['Supplier_ID']])
+    grouped['Expected'] = [(today + timedelta(days=int(days))).isoformat() for days in grouped['Lead_Time']]
+    return grouped.drop(columns='Lead_Time')
@@ -0,0 +1,139 @@
+"""Nearest-warehouse fulfillment routing.
+
+Each order ships from the nearest warehouse that holds the SKU and still has
+dispatch capacity. Distance is the haversine distance from the warehouse to
+the delivery city (data/cities.csv). Warehouse coordinates and capacity come
+from data/warehouses.csv; stock per (SKU, warehouse) comes from the inventory.
+
+A batch is routed in rounds over an orders x warehouses distance matrix.
+In each round every open order picks its nearest feasible warehouse. Orders
+are then accepted in batch order while each warehouse's running units stay
+within its capacity and each SKU's running units stay within its stock
+there. Orders that do not fit try again next round against what is left.
+The first order per warehouse always fits, so every round makes progress.
+Each round is a few numpy passes over the open orders.
+
+Orders that already carry a Warehouse (chosen when they were created, with
+their stock reserved there) keep it: they only use up that warehouse's
+capacity, and just the rest of the batch is routed.
+
+With a handful of warehouses, the full distance matrix is cheaper than a
+KD-tree or ball-tree query would be, and it does not need scipy/sklearn.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import load_cities, load_warehouses, table_version
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DAY = 500        # courier distance covered per day after dispatch
+DEFAULT_DAYS = 3        # delivery estimate for cities without coordinates
+UNKNOWN_KM = 1e9        # cost of an unknown city: any warehouse with stock will do
+ROUTE_COLUMNS = ['Warehouse', 'Distance_km', 'Est_Days']
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    # Great-circle distance in km; arguments in degrees, broadcast like numpy
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _running_totals(keys, values):
+    # Running sum of values within each key, in row order
+    order = np.argsort(keys, kind='stable')
+    sorted_keys, sorted_values = keys[order], values[order]
+    totals = np.cumsum(sorted_values)
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    base = np.maximum.accumulate(np.where(starts, totals - sorted_values, 0))
+    running = np.empty_like(totals)
+    running[order] = totals - base
+    return running
+
+
+class FulfillmentRouter:
+    def __init__(self, warehouses, cities):
+        self.names = warehouses['name'].astype(str).to_numpy()
+        self.lat = warehouses['lat'].to_numpy(dtype=np.float64)
+        self.lon = warehouses['lon'].to_numpy(dtype=np.float64)
+        self.capacity = warehouses['capacity'].to_numpy(dtype=np.int64)
+        self._cities = cities.set_index(cities['name'].astype(str).str.lower())[['lat', 'lon']]
+
+    def distances(self, cities):
+        # (orders, warehouses) matrix of km; NaN rows for unknown cities
+        coords = self._cities.reindex(pd.Series(cities, dtype=object).astype(str).str.lower())
+        return haversine_km(
+            coords['lat'].to_numpy()[:, None], coords['lon'].to_numpy()[:, None],
+            self.lat[None, :], self.lon[None, :]
+        )
+
+    def stock_matrix(self, inventory, skus):
+        # Units on hand per (catalog SKU, warehouse) plus each order's row in it;
+        # unknown SKUs map to an extra, empty last row
+        catalog = pd.Index(inventory['SKU'].astype(str).unique())
+        matrix = np.zeros((len(catalog) + 1, len(self.names)), dtype=np.int64)
+        warehouse = pd.Index(self.names).get_indexer(inventory['Warehouse'].astype(str))
+        known = warehouse >= 0
+        np.add.at(
+            matrix,
+            (catalog.get_indexer(inventory['SKU'].astype(str))[known], warehouse[known]),
+            inventory['Stock'].to_numpy(dtype=np.int64)[known]
+        )
+        codes = catalog.get_indexer(pd.Series(skus, dtype=object).astype(str))
+        return matrix, np.where(codes < 0, len(catalog), codes)
+
+    def route(self, orders, inventory, capacity=None):
+        # orders: frame with City, SKU, Quantity and optionally Warehouse; returns ROUTE_COLUMNS
+        # on the same index (Warehouse is None where no warehouse has the stock and capacity)
+        n = len(orders)
+        quantity = orders['Quantity'].to_numpy(dtype=np.int64)
+        km = self.distances(orders['City'].to_numpy())
+        cost = np.where(np.isnan(km), UNKNOWN_KM, km)
+        stock, sku = self.stock_matrix(inventory, orders['SKU'].to_numpy())
+        remaining = (self.capacity if capacity is None else np.asarray(capacity, dtype=np.int64)).copy()
+        choice = np.full(n, -1)
+        if 'Warehouse' in orders:
+            choice = pd.Index(self.names).get_indexer(orders['Warehouse'].astype(object).where(orders['Warehouse'].notna(), ''))
+            pinned = choice >= 0
+            remaining -= np.bincount(choice[pinned], weights=quantity[pinned], minlength=len(self.names)).astype(np.int64)
+        open_rows = np.flatnonzero(choice < 0)
+
+        while len(open_rows):
+            qty = quantity[open_rows, None]
+            feasible = (stock[sku[open_rows]] >= qty) & (remaining[None, :] >= qty)
+            candidate = np.where(feasible, cost[open_rows], np.inf)
+            best = candidate.argmin(axis=1)
+            # Orders with no feasible warehouse left stay unrouted
+            routable = np.isfinite(candidate[np.arange(len(open_rows)), best])
+            open_rows, best = open_rows[routable], best[routable]
+            if not len(open_rows):
+                break
+            qty = quantity[open_rows]
+            fits = _running_totals(best, qty) <= remaining[best]
+            fits &= _running_totals(sku[open_rows] * len(self.names) + best, qty) <= stock[sku[open_rows], best]
+            accepted, wh = open_rows[fits], best[fits]
+            choice[accepted] = wh
+            remaining -= np.bincount(wh, weights=quantity[accepted], minlength=len(self.names)).astype(np.int64)
+            np.subtract.at(stock, (sku[accepted], wh), quantity[accepted])
+            open_rows = open_rows[~fits]
+
+        routed = choice >= 0
+        distance = np.where(routed, km[np.arange(n), np.maximum(choice, 0)], np.nan)
+        days = np.where(np.isnan(distance), DEFAULT_DAYS, 1 + np.floor(np.nan_to_num(distance) / KM_PER_DAY))
+        return pd.DataFrame({
+            'Warehouse': np.where(routed, self.names[np.maximum(choice, 0)], None),
+            'Distance_km': np.round(distance, 1),
+            'Est_Days': days.astype(np.int64),
+        }, index=orders.index, columns=ROUTE_COLUMNS)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_router(warehouses_version, cities_version):
+    return FulfillmentRouter(load_warehouses(), load_cities())
+
+
+def get_router():
+    # Rebuilt only when data/warehouses.csv or data/cities.csv changes
+    return _cached_router(table_version("warehouses"), table_version("cities"))
@@ -0,0 +1,98 @@
+"""Advanced Search filters compiled into a single mask.
+
+Text, category, supplier and price-bucket filters are combined into one
+boolean array over the inventory and applied once, so no intermediate
+DataFrames are materialised. Results are memoized per filter combination
+until a filter-relevant column of the inventory changes.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Price slider buckets as (exclusive low, inclusive high) bounds
+PRICE_BUCKETS = {
+    "0-1K": (-np.inf, 1000),
+    "1K-5K": (1000, 5000),
+    "5K-20K": (5000, 20000),
+    "20K-50K": (20000, 50000),
+    "50K+": (50000, np.inf),
+}
+FILTER_COLUMNS = ('Product', 'Category', 'Supplier', 'Price')
+MEMO_SIZE = 128
+RESULT_LIMIT = 500       # rows shown per search in the UI
+
+
+def _equals(series, value):
+    # Categorical columns compare on integer codes instead of strings
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if value not in categories:
+            return np.zeros(len(series), dtype=bool)
+        return series.cat.codes.to_numpy() == categories.get_loc(value)
+    return (series == value).to_numpy(dtype=bool, na_value=False)
+
+
+class SearchFilters:
+    def __init__(self, service, search_index):
+        self._service = service
+        self._search_index = search_index
+        self._lock = threading.Lock()
+        self._memo = OrderedDict()
+        self.version = 0
+        service.subscribe(self.on_change)
+
+    def on_change(self, labels, columns):
+        # Stock-only changes don't move rows in or out of any filter
+        if any(column in columns for column in FILTER_COLUMNS):
+            with self._lock:
+                self.version += 1
+                self._memo.clear()
+
+    def mask(self, category=None, supplier=None, price_range=None):
+        frame = self._service.frame
+        mask = np.ones(len(frame), dtype=bool)
+        if category is not None:
+            mask &= _equals(frame['Category'], category)
+        if supplier is not None:
+            mask &= _equals(frame['Supplier'], supplier)
+        if price_range in PRICE_BUCKETS:
+            low, high = PRICE_BUCKETS[price_range]
+            price = frame['Price'].to_numpy()
+            mask &= (price > low) & (price <= high)
+        return mask
+
+    def run(self, query='', fuzzy=False, category=None, supplier=None, price_range=None, limit=None):
+        # Row labels passing every filter, at most limit; text hits keep their search ranking
+        key = (self.version, query.strip().lower(), fuzzy, category, supplier, price_range, limit)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        unfiltered = category is None and supplier is None and price_range not in PRICE_BUCKETS
+        if key[1] and unfiltered:
+            # Nothing to filter out, so the index ranks only the top rows
+            labels = self._search_index.search(query, limit=limit, fuzzy=fuzzy)
+        elif key[1]:
+            mask = self.mask(category, supplier, price_range)
+            ranked = np.asarray(self._search_index.search(query, fuzzy=fuzzy), dtype=np.int64)
+            labels = ranked[mask[ranked]][:limit].tolist()
+        else:
+            labels = np.flatnonzero(self.mask(category, supplier, price_range))[:limit].tolist()
+        with self._lock:
+            if key[0] == self.version:
+                self._memo[key] = labels
+                if len(self._memo) > MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return labels
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_filters(service_key, _service, _search_index):
+    return SearchFilters(_service, _search_index)
+
+
+def get_search_filters(service, search_index):
+    return _cached_filters(service.key, service, search_index)
@@ -0,0 +1,295 @@
+"""Prebuilt product search over Product, Category and Supplier.
+
+Product names are indexed per row by trigram (substring queries) and by
+whole token (prefix queries and ranking). Category and Supplier have only a
+handful of distinct values, so those are matched per value and expanded to
+rows. Matches are ranked: Product hits outrank Category hits, which outrank
+Supplier hits, and whole-word or word-prefix hits get a bonus.
+
+The index is built once per inventory service. Product, Category and
+Supplier only change when data/products.csv or data/suppliers.csv is
+edited, and that builds a new service (and index); stock and sales updates
+never touch it.
+
+Word postings are one sorted label array grouped by word in vocabulary
+order, with offsets per word, so the rows of any set of words are gathered
+in one vectorized step. Words starting with a prefix are a contiguous
+vocabulary range, and words containing a substring are found through an
+index of every 1-3 character substring of the vocabulary. A plain word
+query is the union of the rows of every word containing it. Other queries
+intersect their trigram postings, rarest first, with binary searches and
+then confirm the substring on the few candidates left. Bonuses are looked
+up in per-row masks, and `search(limit=...)` ranks only the best rows.
+
+Fuzzy mode works on the word vocabulary rather than on rows: a misspelled
+word ("chargr", "cvr") is matched to known words through a padded n-gram
+index, and only a bounded number of candidates is scored per query word.
+"""
+import bisect
+import difflib
+import heapq
+import re
+
+import numpy as np
+import streamlit as st
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+PRODUCT_WEIGHT = 3.0
+VALUE_WEIGHTS = {'Category': 2.0, 'Supplier': 1.0}
+PREFIX_BONUS = 1.0
+EXACT_BONUS = 1.0
+SUBWORD_MAX = 3     # vocabulary words are indexed by every substring up to this length
+# Fuzzy mode: vocabulary words scored per query word, the similarity needed
+# to count as a match, and how many matching words each query word may use
+FUZZY_CANDIDATES = 200
+FUZZY_CUTOFF = 0.7
+FUZZY_MATCHES = 5
+MENTION_LIMIT = 5    # products resolved from one chat message
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def substrings(word, longest=SUBWORD_MAX):
+    return {word[i:i + n] for n in range(1, longest + 1) for i in range(len(word) - n + 1)}
+
+
+def fuzzy_grams(word):
+    # Padded bigrams and trigrams; bigrams keep short words like "cvr" findable
+    padded = ' ' + word + ' '
+    grams = {padded[i:i + 2] for i in range(len(padded) - 1)}
+    grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def _intersect(postings):
+    # Common labels of sorted arrays, starting from the shortest
+    postings = sorted(postings, key=len)
+    candidates = postings[0]
+    for labels in postings[1:]:
+        if not len(candidates):
+            break
+        positions = np.minimum(np.searchsorted(labels, candidates), len(labels) - 1)
+        candidates = candidates[labels[positions] == candidates]
+    return candidates
+
+
+def _arrays(postings):
+    return {key: np.array(labels, dtype=np.int64) for key, labels in postings.items()}
+
+
+class ProductSearchIndex:
+    # Labels are the inventory's integer row labels (a RangeIndex from read_csv)
+    def __init__(self, inventory):
+        names = inventory['Product'].astype(str).str.lower()
+        self._names = dict(sorted(zip(inventory.index.tolist(), names.tolist())))  # label -> lowered name
+        self._bound = max(self._names, default=-1) + 1   # size of per-row masks
+        grams, words = {}, {}
+        for label, name in self._names.items():
+            for gram in trigrams(name):
+                grams.setdefault(gram, []).append(label)
+            for token in set(TOKEN_RE.findall(name)):
+                words.setdefault(token, []).append(label)
+        self._grams = _arrays(grams)    # trigram -> sorted labels whose name contains it
+
+        # Word postings: rows of vocabulary word i are _rows[_offsets[i]:_offsets[i + 1]]
+        self._vocab = sorted(words)
+        self._ids = {token: i for i, token in enumerate(self._vocab)}
+        self._offsets = np.zeros(len(self._vocab) + 1, dtype=np.int64)
+        self._offsets[1:] = np.cumsum([len(words[token]) for token in self._vocab])
+        self._rows = np.array([label for token in self._vocab for label in words[token]], dtype=np.int64)
+
+        subwords, vocab_grams = {}, {}
+        for i, token in enumerate(self._vocab):
+            for part in substrings(token):
+                subwords.setdefault(part, []).append(i)
+            # Pure numbers (model/pack sizes) are only ever matched exactly
+            if not token.isdigit():
+                for gram in fuzzy_grams(token):
+                    vocab_grams.setdefault(gram, []).append(token)
+        self._subwords = _arrays(subwords)  # 1-3 character substring -> ids of words containing it
+        self._vocab_grams = vocab_grams     # fuzzy n-gram -> vocabulary words containing it
+
+        self._values = {field: {} for field in VALUE_WEIGHTS}   # field -> lowered value -> labels
+        for field in VALUE_WEIGHTS:
+            values = inventory[field].astype(str).str.lower()
+            for value, labels in values.groupby(values, sort=False).groups.items():
+                self._values[field][value] = np.sort(np.asarray(labels, dtype=np.int64))
+
+    # -- queries -----------------------------------------------------------
+
+    def _prefix_range(self, prefix):
+        # Vocabulary ids [start, end) of the words starting with prefix
+        start = bisect.bisect_left(self._vocab, prefix)
+        return start, bisect.bisect_left(self._vocab, prefix + '\uffff', start)
+
+    def _range_rows(self, start, end):
+        # Rows of vocabulary words start..end-1 (one slice, unsorted across words)
+        return self._rows[self._offsets[start]:self._offsets[end]]
+
+    def _word_rows(self, token):
+        i = self._ids[token]
+        return self._range_rows(i, i + 1)
+
+    def _containing(self, word):
+        # Ids of vocabulary words containing word
+        if len(word) <= SUBWORD_MAX:
+            return self._subwords.get(word, EMPTY)
+        grams = trigrams(word)
+        if any(gram not in self._subwords for gram in grams):
+            return EMPTY
+        ids = _intersect([self._subwords[gram] for gram in grams])
+        vocab = self._vocab
+        return np.array([i for i in ids.tolist() if word in vocab[i]], dtype=np.int64)
+
+    def _union(self, ids):
+        # Sorted rows having any of the given vocabulary words
+        if len(ids) == 1:
+            return self._range_rows(ids[0], ids[0] + 1)
+        if not len(ids):
+            return EMPTY
+        starts = self._offsets[ids]
+        lengths = self._offsets[ids + 1] - starts
+        # Gather every word's slice at once: position k of word j is starts[j] + k
+        shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        mask = np.zeros(self._bound, dtype=bool)
+        mask[self._rows[shift + np.arange(len(shift))]] = True
+        return np.flatnonzero(mask)
+
+    def _product_matches(self, query):
+        # Sorted array of rows whose name contains query
+        if TOKEN_RE.fullmatch(query):
+            # A run of letters/digits can only occur inside one word of the name
+            return self._union(self._containing(query))
+        grams = trigrams(query)
+        if not grams:
+            # Too short for trigrams; names are scanned directly
+            return np.array([label for label, name in self._names.items() if query in name], dtype=np.int64)
+        if any(gram not in self._grams for gram in grams):
+            return EMPTY
+        candidates = _intersect([self._grams[gram] for gram in grams])
+        # Trigrams can match out of order, so confirm the substring
+        names = self._names
+        return np.array([label for label in candidates.tolist() if query in names[label]], dtype=np.int64)
+
+    def prefix_tokens(self, prefix):
+        # Vocabulary words starting with prefix, from the sorted word list
+        return self._vocab[slice(*self._prefix_range(prefix))]
+
+    def mentioned(self, text, limit=MENTION_LIMIT):
+        # First rows naming the catalog words of free text (e.g. a chat message).
+        # Starts from the rarest word's rows and narrows them by each more common
+        # word, skipping a word that would leave nothing, so the work is bounded
+        # by the rarest posting rather than by every word's rows.
+        postings = sorted((self._word_rows(token) for token in set(tokenize(text)) if token in self._ids), key=len)
+        if not postings:
+            return []
+        candidates = postings[0]
+        for labels in postings[1:]:
+            narrowed = _intersect([candidates, labels])
+            if len(narrowed):
+                candidates = narrowed
+        return candidates[:limit].tolist()
+
+    def similar_words(self, word):
+        # [(vocabulary word, similarity)] best first; exact words score 1.0
+        if word in self._ids:
+            return [(word, 1.0)]
+        overlap = {}
+        for gram in fuzzy_grams(word):
+            for token in self._vocab_grams.get(gram, ()):
+                overlap[token] = overlap.get(token, 0) + 1
+        max_gap = max(2, len(word) // 2)
+        candidates = [token for token in overlap if abs(len(token) - len(word)) <= max_gap]
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, candidates, key=overlap.__getitem__)
+        scored = []
+        for token in candidates:
+            ratio = difflib.SequenceMatcher(None, word, token).ratio()
+            if ratio >= FUZZY_CUTOFF:
+                scored.append((token, ratio))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:FUZZY_MATCHES]
+
+    def fuzzy_scores(self, query):
+        # (labels, scores): each query word adds its best similarity in the row
+        parts = []
+        for word in tokenize(query):
+            matches = self.similar_words(word)
+            if not matches:
+                continue
+            rows = [self._word_rows(token) for token, _ in matches]
+            labels = np.concatenate(rows)
+            ratios = np.concatenate([np.full(len(labels), ratio) for labels, (_, ratio) in zip(rows, matches)])
+            # Keep only the best similarity per row for this word
+            order = np.lexsort((-ratios, labels))
+            labels, ratios = labels[order], ratios[order]
+            first = np.ones(len(labels), dtype=bool)
+            first[1:] = labels[1:] != labels[:-1]
+            parts.append((labels[first], ratios[first]))
+        if not parts:
+            return EMPTY, EMPTY.astype(np.float64)
+        labels, inverse = np.unique(np.concatenate([labels for labels, _ in parts]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([scores for _, scores in parts]))
+        return labels, scores
+
+    def scores(self, query):
+        # (labels, scores) arrays for every row matching query as a substring
+        query = query.strip().lower()
+        if not query:
+            return EMPTY, EMPTY.astype(np.float64)
+        parts = []
+        labels = self._product_matches(query)
+        if len(labels):
+            # Bonuses from the word postings: rows with a word starting with
+            # the query word, and rows having it as a whole word
+            bonus = np.zeros(len(labels), dtype=np.float64)
+            mask = np.zeros(self._bound, dtype=bool)
+            for token in tokenize(query):
+                mask[:] = False
+                mask[self._range_rows(*self._prefix_range(token))] = True
+                bonus += PREFIX_BONUS * mask[labels]
+                if token in self._ids:
+                    mask[:] = False
+                    mask[self._word_rows(token)] = True
+                    bonus += EXACT_BONUS * mask[labels]
+            parts.append((labels, PRODUCT_WEIGHT + bonus))
+        for field, weight in VALUE_WEIGHTS.items():
+            for value, labels in self._values[field].items():
+                if query in value:
+                    parts.append((labels, np.full(len(labels), weight)))
+        if not parts:
+            return EMPTY, EMPTY.astype(np.float64)
+        if len(parts) == 1:
+            return parts[0]
+        # A row can match in several fields: sum its weights
+        labels, inverse = np.unique(np.concatenate([labels for labels, _ in parts]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([weights for _, weights in parts]))
+        return labels, scores
+
+    def search(self, query, limit=None, fuzzy=False):
+        # Labels ordered by score, then catalog order
+        labels, scores = self.fuzzy_scores(query) if fuzzy else self.scores(query)
+        if limit is not None and limit < len(labels):
+            # Rows above the limit-th score, then the earliest rows tied with it
+            cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            tied = np.flatnonzero(scores == cutoff)
+            tied = tied[np.argsort(labels[tied], kind='stable')][:limit - np.count_nonzero(scores > cutoff)]
+            keep = np.concatenate([np.flatnonzero(scores > cutoff), tied])
+            labels, scores = labels[keep], scores[keep]
+        order = np.lexsort((labels, -scores))
+        return labels[order].tolist()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_index(service_key, _service):
+    return ProductSearchIndex(_service.frame)
+
+
+def get_search_index(service):
+    return _cached_index(service.key, service)
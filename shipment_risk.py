@@ -0,0 +1,170 @@
+"""Delay-risk scoring for inbound shipments (data/shipments.csv).
+
+Each open shipment is joined to its supplier's on-time record and to the
+product it restocks (stock, daily sales, destination warehouse), then scored
+in one vectorized pass:
+
+- late: the ETA has passed and the shipment is not received
+- flagged: the carrier status already mentions a delay
+- stock-out: stock on hand will not last until arrival plus the SLA
+  (settings.json sla_days)
+- risk region: the destination warehouse is in settings.json risk_regions
+- supplier: weighted by the supplier's share of late shipments
+
+Scores are kept between refreshes. When the shipments file changes, only
+rows whose content changed are rescored (rows are compared by hash). The
+same goes for rows whose product's stock or sales moved, and for suppliers
+whose on-time rate changed. Everything is rescored once per day, since
+lateness depends on the date.
+"""
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+LATE_WEIGHT = 0.4
+DELAY_STATUS_WEIGHT = 0.25
+STOCKOUT_WEIGHT = 0.2
+REGION_WEIGHT = 0.1
+SUPPLIER_WEIGHT = 0.15
+HIGH_RISK = 0.5
+MEDIUM_RISK = 0.25
+
+RISK_COLUMNS = [
+    'Shipment_ID', 'Supplier_ID', 'SKU', 'Product', 'Warehouse', 'Qty', 'ETA',
+    'Days_Late', 'Cover_Days', 'Risk_Score', 'Risk_Level', 'Reason',
+]
+
+
+def supplier_on_time(shipments):
+    # Share of on-time shipments per supplier
+    return shipments.groupby(shipments['supplier_id'].astype(str), observed=True)['on_time'].mean()
+
+
+def score_shipments(shipments, inventory, on_time, risk_regions, sla_days, today):
+    # One row per shipment in RISK_COLUMNS, indexed by shipment_id
+    by_sku = inventory.set_index(inventory['SKU'].astype(str))
+    sku = shipments['sku'].astype(str)
+    supplier = shipments['supplier_id'].astype(str)
+    stock = sku.map(by_sku['Stock']).fillna(0).to_numpy(dtype=np.float64)
+    daily_sales = sku.map(by_sku['Daily_Sales']).fillna(0).to_numpy(dtype=np.float64)
+    warehouse = sku.map(by_sku['Warehouse'].astype(str)).fillna('')
+    eta = shipments['eta'].to_numpy(dtype='datetime64[D]')
+    days_to_eta = (eta - np.datetime64(today, 'D')).astype(np.int64)
+    open_rows = ~shipments['received'].to_numpy(dtype=bool)
+
+    late = open_rows & (days_to_eta < 0)
+    flagged = open_rows & shipments['status'].astype(str).str.contains('delay', case=False).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(daily_sales > 0, stock / daily_sales, np.inf)
+    stockout = open_rows & (cover < np.maximum(days_to_eta, 0) + sla_days)
+    region = open_rows & warehouse.isin(risk_regions).to_numpy()
+    unreliable = np.where(open_rows, 1.0 - supplier.map(on_time).fillna(1.0).to_numpy(dtype=np.float64), 0.0)
+
+    score = np.minimum(
+        LATE_WEIGHT * late + DELAY_STATUS_WEIGHT * flagged + STOCKOUT_WEIGHT * stockout
+        + REGION_WEIGHT * region + SUPPLIER_WEIGHT * unreliable,
+        1.0
+    )
+    level = np.select(
+        [~open_rows, score >= HIGH_RISK, score >= MEDIUM_RISK],
+        ['Received', 'High', 'Medium'],
+        'Low'
+    )
+    reasons = [
+        (late, 'late ' + pd.Series(-days_to_eta).astype(str).to_numpy() + 'd'),
+        (flagged, shipments['status'].astype(str).to_numpy()),
+        (stockout, np.full(len(shipments), 'stock runs out first')),
+        (region, 'risk region ' + warehouse.to_numpy()),
+    ]
+    reason = np.full(len(shipments), '', dtype=object)
+    for mask, text in reasons:
+        reason = np.where(mask, np.where(reason == '', text, reason + '; ' + text), reason)
+
+    return pd.DataFrame({
+        'Shipment_ID': shipments['shipment_id'].astype(str).to_numpy(),
+        'Supplier_ID': supplier.to_numpy(),
+        'SKU': sku.to_numpy(),
+        'Product': sku.map(by_sku['Product']).fillna(sku).to_numpy(),
+        'Warehouse': warehouse.to_numpy(),
+        'Qty': shipments['qty'].to_numpy(),
+        'ETA': eta,
+        'Days_Late': np.where(late, -days_to_eta, 0),
+        'Cover_Days': np.round(cover, 1),
+        'Risk_Score': np.round(score, 3),
+        'Risk_Level': level,
+        'Reason': reason,
+    }, index=shipments['shipment_id'].astype(str).to_numpy(), columns=RISK_COLUMNS)
+
+
+class ShipmentRiskEngine:
+    def __init__(self, inventory_service, risk_regions=(), sla_days=3):
+        self._inventory = inventory_service
+        self._risk_regions = list(risk_regions)
+        self._sla_days = sla_days
+        self._lock = threading.Lock()
+        self._source = None                 # shipments frame the scores were built from
+        self._hashes = pd.Series(dtype=np.uint64)
+        self._on_time = pd.Series(dtype=np.float64)
+        self._day = None
+        self._stale_skus = set()
+        self.scores = pd.DataFrame(columns=RISK_COLUMNS)
+        self.version = 0
+        inventory_service.subscribe(self.on_change)
+
+    def on_change(self, labels, columns):
+        # InventoryService listener: stock or sales changes affect stock-out risk
+        if 'Stock' in columns or 'Daily_Sales' in columns:
+            skus = self._inventory.frame.loc[labels, 'SKU'].astype(str)
+            with self._lock:
+                self._stale_skus.update(skus)
+
+    def refresh(self, shipments, today=None):
+        # Rescore only what changed since the last refresh; returns the number of rows rescored
+        today = today or date.today()
+        with self._lock:
+            if shipments is self._source and today == self._day and not self._stale_skus:
+                return 0
+            ids = shipments['shipment_id'].astype(str)
+            hashes = pd.Series(pd.util.hash_pandas_object(shipments, index=False).to_numpy(), index=ids.to_numpy())
+            on_time = supplier_on_time(shipments)
+            if today != self._day:
+                changed = np.ones(len(shipments), dtype=bool)
+            else:
+                previous = self._hashes.reindex(hashes.index, fill_value=0).to_numpy()
+                changed = previous != hashes.to_numpy()
+                if self._stale_skus:
+                    changed |= shipments['sku'].isin(list(self._stale_skus)).to_numpy()
+                moved = on_time.index[~on_time.eq(self._on_time.reindex(on_time.index))]
+                if len(moved):
+                    changed |= shipments['supplier_id'].isin(list(moved)).to_numpy()
+            # Previous scores in the new row order; changed and new rows are replaced below
+            scores = self.scores.reindex(hashes.index)
+            if changed.any():
+                rescored = score_shipments(
+                    shipments[changed], self._inventory.frame, on_time,
+                    self._risk_regions, self._sla_days, today
+                )
+                scores = pd.concat([scores[~changed], rescored]).reindex(hashes.index)
+            self.scores = scores
+            self._source, self._hashes, self._on_time, self._day = shipments, hashes, on_time, today
+            self._stale_skus.clear()
+            self.version += 1
+            return int(changed.sum())
+
+    def at_risk(self, levels=('High', 'Medium')):
+        # Open shipments at the given risk levels, highest score first
+        with self._lock:
+            scores = self.scores
+        return scores[scores['Risk_Level'].isin(levels)].sort_values('Risk_Score', ascending=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_engine(service_key, _service, risk_regions, sla_days):
+    return ShipmentRiskEngine(_service, risk_regions, sla_days)
+
+
+def get_risk_engine(service, settings):
+    return _cached_engine(service.key, service, tuple(settings.get('risk_regions', ())), settings.get('sla_days', 3))
@@ -0,0 +1,250 @@
+"""Day-in-the-life supply chain simulator over the data/ tables.
+
+A discrete-event simulation driven by a heap of (day, priority, seq) events:
+
+- arrival: a purchase order or an open shipment from data/shipments.csv
+  lands and its units go on the shelf (handled before that day's demand)
+- day: customer demand for every SKU is drawn at once (Poisson around
+  Daily_Sales), filled from stock, and the rest is lost. SKUs below their
+  reorder point are then reordered with reorder.order_quantities, the rule
+  behind the app's reorder plan, with units already on order as inbound.
+  The lines go out as one purchase order per supplier, and each order
+  schedules its own arrival.
+
+A purchase order is late with the supplier's historical late-shipment rate
+(on_time in data/shipments.csv) and then slips by up to its lead time again.
+
+The catalog is held as numpy arrays and every daily step is vectorized, so
+the heap only carries a few events per day, whatever the number of SKUs.
+`--skus` tiles the catalog with scaled demand for load tests.
+
+Run from the repository root:
+    python simulator.py [--days 365] [--skus 100000] [--seed 7] [--out daily.csv]
+"""
+import argparse
+import heapq
+import itertools
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import build_inventory, load_settings, load_suppliers, read_table, table_version
+from inventory_service import current_shipments
+from reorder import order_quantities
+
+ARRIVAL, DAY = 0, 1     # event priorities: stock lands before the day's demand
+DAILY_COLUMNS = [
+    'Date', 'Demand', 'Units_Sold', 'Lost_Sales', 'Revenue', 'Stockouts',
+    'Stock_Units', 'Stock_Value', 'Purchase_Orders', 'Units_Ordered',
+    'Units_Received', 'Late_Arrivals',
+]
+SKU_COLUMNS = [
+    'SKU', 'Product', 'Demand', 'Units_Sold', 'Lost_Sales', 'Fill_Rate',
+    'Ending_Stock', 'Stockout_Days', 'Reorders',
+]
+
+
+class SimulationResult:
+    def __init__(self, daily, skus, events, seconds):
+        self.daily = daily          # one row per simulated day (DAILY_COLUMNS)
+        self.skus = skus            # one row per SKU (SKU_COLUMNS)
+        self.events = events        # heap events processed
+        self.seconds = seconds
+
+    def summary(self):
+        demand = self.daily['Demand'].sum()
+        return {
+            'days': len(self.daily),
+            'skus': len(self.skus),
+            'fill_rate': float(self.daily['Units_Sold'].sum() / demand) if demand else 1.0,
+            'units_sold': int(self.daily['Units_Sold'].sum()),
+            'lost_sales': int(self.daily['Lost_Sales'].sum()),
+            'revenue': int(self.daily['Revenue'].sum()),
+            'purchase_orders': int(self.daily['Purchase_Orders'].sum()),
+            'late_arrivals': int(self.daily['Late_Arrivals'].sum()),
+            'events': self.events,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+class Simulator:
+    def __init__(self, inventory, suppliers, shipments, start=None, seed=0, auto_reorder=True):
+        self.start = start or date.today()
+        self.auto_reorder = auto_reorder
+        self.rng = np.random.default_rng(seed)
+        self.sku = inventory['SKU'].astype(str).to_numpy()
+        self.product = inventory['Product'].astype(str).to_numpy()
+        self.stock = inventory['Stock'].to_numpy(dtype=np.int64).copy()
+        self.daily_sales = inventory['Daily_Sales'].to_numpy(dtype=np.float64)
+        self.price = inventory['Price'].to_numpy(dtype=np.float64)
+        self.reorder_point = inventory['Min_Stock'].to_numpy(dtype=np.float64)
+        self.reorder_qty = inventory['Reorder_Qty'].to_numpy(dtype=np.float64)
+
+        by_supplier = suppliers.set_index(suppliers['supplier_id'].astype(str))
+        on_time = shipments.groupby(shipments['supplier_id'].astype(str), observed=True)['on_time'].mean()
+        self.suppliers = pd.Index(by_supplier.index)
+        self.supplier = self.suppliers.get_indexer(inventory['Supplier_ID'].astype(str))
+        self.lead_time = by_supplier['lead_time_days'].to_numpy(dtype=np.int64)
+        self.moq = by_supplier['min_order_qty'].to_numpy(dtype=np.float64)
+        self.late_rate = 1.0 - on_time.reindex(self.suppliers).fillna(1.0).to_numpy(dtype=np.float64)
+        sku_lead = np.where(self.supplier >= 0, self.lead_time[self.supplier], 0)
+        sku_moq = np.where(self.supplier >= 0, self.moq[self.supplier], 0)
+        self.sku_lead, self.sku_moq = sku_lead.astype(np.float64), sku_moq
+
+        self.on_order = np.zeros(len(self.sku), dtype=np.int64)
+        self._events = []
+        self._seq = itertools.count()
+        self._schedule_open_shipments(shipments)
+
+    def schedule(self, day, priority, payload=None):
+        heapq.heappush(self._events, (day, priority, next(self._seq), payload))
+
+    def _schedule_open_shipments(self, shipments):
+        # Unreceived rows land on their ETA (overdue ones on day 0)
+        open_rows = shipments[~shipments['received']]
+        idx = pd.Index(self.sku).get_indexer(open_rows['sku'].astype(str))
+        known = idx >= 0
+        if not known.any():
+            return
+        eta = open_rows['eta'].to_numpy(dtype='datetime64[D]')[known]
+        day = np.maximum((eta - np.datetime64(self.start, 'D')).astype(np.int64), 0)
+        idx, qty = idx[known], open_rows['qty'].to_numpy(dtype=np.int64)[known]
+        np.add.at(self.on_order, idx, qty)
+        for d in np.unique(day):
+            on_day = day == d
+            self.schedule(int(d), ARRIVAL, (idx[on_day], qty[on_day], False))
+
+    def _reorder(self, today):
+        # reorder.py's rule, one purchase order per supplier; returns (SKUs reordered, orders, units)
+        low = np.flatnonzero((self.stock < self.reorder_point) & (self.supplier >= 0))
+        qty = order_quantities(
+            self.stock[low], self.on_order[low], self.reorder_point[low], self.daily_sales[low],
+            self.sku_lead[low], self.reorder_qty[low], self.sku_moq[low]
+        )
+        due, qty = low[qty > 0], qty[qty > 0]
+        if not len(due):
+            return due, 0, 0
+        self.on_order[due] += qty
+        suppliers = self.supplier[due]
+        order = np.argsort(suppliers, kind='stable')
+        due, qty, suppliers = due[order], qty[order], suppliers[order]
+        groups = np.flatnonzero(np.diff(suppliers)) + 1
+        for lines, units, supplier in zip(np.split(due, groups), np.split(qty, groups), suppliers[np.r_[0, groups]]):
+            lead = int(self.lead_time[supplier])
+            late = self.rng.random() < self.late_rate[supplier]
+            delay = int(self.rng.integers(1, lead + 1)) if late and lead else 0
+            self.schedule(today + max(lead, 1) + delay, ARRIVAL, (lines, units, late))
+        return due, len(groups) + 1, int(qty.sum())
+
+    def run(self, days):
+        started = time.perf_counter()
+        n = len(self.sku)
+        daily = np.zeros((days, len(DAILY_COLUMNS) - 1))
+        demand_total = np.zeros(n, dtype=np.int64)
+        sold_total = np.zeros(n, dtype=np.int64)
+        stockout_days = np.zeros(n, dtype=np.int64)
+        reorders = np.zeros(n, dtype=np.int64)
+        for day in range(days):
+            self.schedule(day, DAY)
+        events = 0
+
+        while self._events and self._events[0][0] < days:
+            day, priority, _, payload = heapq.heappop(self._events)
+            events += 1
+            row = daily[day]
+            if priority == ARRIVAL:
+                idx, qty, late = payload
+                np.add.at(self.stock, idx, qty)
+                np.subtract.at(self.on_order, idx, qty)
+                row[9] += qty.sum()
+                row[10] += late
+                continue
+            demand = self.rng.poisson(self.daily_sales)
+            sold = np.minimum(demand, self.stock)
+            self.stock -= sold
+            demand_total += demand
+            sold_total += sold
+            empty = self.stock == 0
+            stockout_days += empty
+            row[0:5] = demand.sum(), sold.sum(), demand.sum() - sold.sum(), sold @ self.price, np.count_nonzero(empty)
+            row[5:7] = self.stock.sum(), self.stock @ self.price
+            if self.auto_reorder:
+                due, orders, units = self._reorder(day)
+                row[7:9] = orders, units
+                reorders[due] += 1
+
+        daily_frame = pd.DataFrame(daily, columns=DAILY_COLUMNS[1:]).round(0).astype(np.int64)
+        daily_frame.insert(0, 'Date', pd.date_range(self.start, periods=days, freq='D'))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fill_rate = np.where(demand_total > 0, sold_total / demand_total, 1.0)
+        skus = pd.DataFrame({
+            'SKU': self.sku,
+            'Product': self.product,
+            'Demand': demand_total,
+            'Units_Sold': sold_total,
+            'Lost_Sales': demand_total - sold_total,
+            'Fill_Rate': np.round(fill_rate, 3),
+            'Ending_Stock': self.stock,
+            'Stockout_Days': stockout_days,
+            'Reorders': reorders,
+        }, columns=SKU_COLUMNS)
+        return SimulationResult(daily_frame, skus, events, time.perf_counter() - started)
+
+
+def synthetic_catalog(inventory, size, seed=0):
+    # The catalog tiled to size rows with unique SKUs and lognormally scaled demand
+    rng = np.random.default_rng(seed)
+    tiled = inventory.iloc[np.arange(size) % len(inventory)].reset_index(drop=True)
+    scale = rng.lognormal(0.0, 0.5, size)
+    return tiled.assign(
+        SKU=tiled['SKU'].astype(str) + '-' + pd.Series(np.arange(size) // len(inventory)).astype(str),
+        Daily_Sales=np.round(tiled['Daily_Sales'].to_numpy(dtype=np.float64) * scale, 2),
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_run(days, seed, auto_reorder, inventory_version, suppliers_version, shipments_version, _inventory, _shipments):
+    simulator = Simulator(_inventory, load_suppliers(), _shipments, seed=seed, auto_reorder=auto_reorder)
+    return simulator.run(days)
+
+
+def get_simulation(service, days, seed=0):
+    # Starts from the live inventory; shared per (days, seed) until stock, suppliers, shipments or the date change
+    return _cached_run(
+        days, seed, bool(load_settings().get('auto_reorder', True)),
+        (service.key, service.version), table_version("suppliers"),
+        (table_version("shipments"), service.received_shipments(), date.today()),
+        service.frame, current_shipments(service)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--skus', type=int, default=0, help="tile the catalog to this many SKUs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--no-reorder', action='store_true', help="disable automatic reordering")
+    parser.add_argument('--out', help="write the daily table to this CSV")
+    args = parser.parse_args(argv)
+
+    suppliers = read_table("suppliers")
+    inventory = build_inventory(read_table("products"), suppliers)
+    if args.skus:
+        inventory = synthetic_catalog(inventory, args.skus, args.seed)
+    simulator = Simulator(
+        inventory, suppliers, read_table("shipments"),
+        start=args.start, seed=args.seed, auto_reorder=not args.no_reorder
+    )
+    result = simulator.run(args.days)
+    for key, value in result.summary().items():
+        print(f"{key:>16}: {value}")
+    if args.out:
+        result.daily.to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()